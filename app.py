@@ -1,14 +1,16 @@
 import os
+import sys
 import json
+import bisect
+import pickle
+import threading
+from functools import lru_cache
 import requests
-from flask import Flask, request, jsonify
+import orjson
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 from dotenv import load_dotenv # For loading environment variables
 
-# Import Vertex AI specific libraries
-import vertexai
-from vertexai.generative_models import GenerativeModel, Part, Image
-
 # Load environment variables from .env file.
 # This should be called as early as possible to make environment variables available.
 load_dotenv()
@@ -16,54 +18,139 @@ load_dotenv()
 # Initialize Flask app
 app = Flask(__name__)
 
+# Cap request bodies (image uploads to /understand_image) so an oversized upload is rejected
+# with a 413 before it is buffered, instead of being read fully into memory.
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024
+
 # Enable CORS for all origins, allowing your frontend to connect.
 # In a production environment, you would restrict this to specific origins for security.
 CORS(app)
 
-# Initialize Vertex AI with your project ID and location.
+
+def json_response(payload, status=200):
+    """
+    Builds a JSON Response with orjson, which encodes much faster than jsonify's stdlib json.
+    Used for the data-carrying responses (parsed ingredients, search results, trust reports);
+    the small error bodies still go through jsonify.
+    """
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+# Vertex AI is imported and initialized on the first request that needs it, not at import:
+# the SDK import, vertexai.init() and model construction are slow, and most endpoints
+# (/parse_ingredient, /search_ingredient, /trust_report) never use it.
 # It's highly recommended to load these from environment variables for security and flexibility.
 # Ensure your .env file contains GOOGLE_CLOUD_PROJECT and GOOGLE_CLOUD_LOCATION.
-try:
-    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-    location = os.getenv("GOOGLE_CLOUD_LOCATION")
-    if not project_id or not location:
-        # If environment variables are not set, print a warning but don't exit.
-        # This allows the app to run, but Vertex AI related endpoints will fail.
-        print("Warning: GOOGLE_CLOUD_PROJECT and GOOGLE_CLOUD_LOCATION environment variables are not set.")
-        print("Vertex AI functionality will not be available.")
-        vertex_ai_initialized = False
-    else:
+_vertex_ai_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _init_vertex_ai():
+    """
+    Imports and initializes Vertex AI once. Returns True if it is available.
+    The result (including failure) is cached, so a misconfigured server doesn't retry per request.
+    """
+    try:
+        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+        location = os.getenv("GOOGLE_CLOUD_LOCATION")
+        if not project_id or not location:
+            # If environment variables are not set, print a warning but don't exit.
+            # This allows the app to run, but Vertex AI related endpoints will fail.
+            print("Warning: GOOGLE_CLOUD_PROJECT and GOOGLE_CLOUD_LOCATION environment variables are not set.")
+            print("Vertex AI functionality will not be available.")
+            return False
+        import vertexai
         vertexai.init(project=project_id, location=location)
-        # Initialize the GenerativeModel for text and multimodal content
-        # We will use 'gemini-1.5-flash-001' as it's a good general-purpose model.
-        # If you need specific capabilities, you can change this model.
-        # This model instance will be used for text generation and image understanding.
-        gemini_flash_model = GenerativeModel("gemini-1.5-flash-001")
-        imagen_model = GenerativeModel("imagen-3.0-generate-002") # Model for image generation
         print(f"Vertex AI initialized successfully for project: {project_id}, location: {location}")
-        vertex_ai_initialized = True
-except Exception as e:
-    print(f"Error initializing Vertex AI: {e}")
-    vertex_ai_initialized = False
+        return True
+    except Exception as e:
+        print(f"Error initializing Vertex AI: {e}")
+        return False
+
+def vertex_ai_initialized():
+    """Initializes Vertex AI on first call (serialized, so concurrent requests init it once)."""
+    with _vertex_ai_lock:
+        return _init_vertex_ai()
+
+@lru_cache(maxsize=1)
+def _get_gemini_flash_model():
+    """
+    The GenerativeModel for text and multimodal content, created on first use.
+    We will use 'gemini-1.5-flash-001' as it's a good general-purpose model.
+    If you need specific capabilities, you can change this model.
+    This model instance will be used for text generation and image understanding.
+    """
+    from vertexai.generative_models import GenerativeModel
+    return GenerativeModel("gemini-1.5-flash-001")
+
+@lru_cache(maxsize=1)
+def _get_imagen_model():
+    """Model for image generation, created on first use."""
+    from vertexai.generative_models import GenerativeModel
+    return GenerativeModel("imagen-3.0-generate-002")
 
 # --- Configuration and Data Loading ---
 # Define paths for ingredient data files
 # These paths are relative to the directory where app.py is run.
 INGREDIENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'common_ingredients_live.json')
 STRUCTURED_INGREDIENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'structured_common_ingredients_live.json')
+VERIFIED_INGREDIENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'structured_verified_ingredients_reparsed_v2.json')
 
 # Global variables to store loaded data
-common_ingredients_set = set()
+common_ingredients_set = frozenset() # Immutable once loaded; parse_with_global_set relies on it
 structured_common_ingredients = []
+verified_ingredients_map = {} # New global variable for verified ingredients
+# The cached verified_ingredients_map holds built keys, not file data, so a key format change
+# doesn't make it older than its source. Bump this whenever _verified_key changes; the
+# version is part of the cache name, so old-format caches are ignored.
+VERIFIED_MAP_CACHE_VERSION = 1
+VERIFIED_MAP_CACHE_NAME = f'verified_ingredients_map.v{VERIFIED_MAP_CACHE_VERSION}'
+structured_search_blob, structured_search_starts, structured_searchable = '', [], [] # See build_search_index
+
+def _pickle_cache_path(source_path, name=None):
+    """Returns the pickle cache path for a data file: <data dir>/.cache/<name or file name>.pkl"""
+    directory, file_name = os.path.split(source_path)
+    return os.path.join(directory, '.cache', (name or file_name) + '.pkl')
+
+def load_pickle_cache(source_path, name=None):
+    """
+    Returns the object pickled for source_path, or None if there is no cache or it is
+    older than the source file (the data files are regenerated in place).
+    """
+    cache_path = _pickle_cache_path(source_path, name)
+    try:
+        if os.path.getmtime(cache_path) < os.path.getmtime(source_path):
+            return None
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None # Missing, stale or unreadable cache; the caller rebuilds it
+
+def save_pickle_cache(source_path, data, name=None):
+    """Pickles data next to source_path for the next startup. Written atomically, so concurrent workers never read a partial file."""
+    cache_path = _pickle_cache_path(source_path, name)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Warning: Could not save cache for {source_path}: {e}")
 
 def load_json_data(file_path):
     """
     Loads JSON data from a specified file path.
     Returns the loaded data or None if an error occurs.
+    The parsed data is pickled next to the file, so restarts skip JSON parsing
+    until the file changes.
     """
+    data = load_pickle_cache(file_path)
+    if data is not None:
+        return data
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        save_pickle_cache(file_path, data)
+        return data
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
         return None
@@ -74,22 +161,134 @@ def load_json_data(file_path):
         print(f"An unexpected error occurred while loading {file_path}: {e}")
         return None
 
-# Load ingredient data on application startup
-# It's crucial that these files are in the specified 'data' directory
-# relative to your backend folder.
-loaded_common_ingredients = load_json_data(INGREDIENTS_FILE_PATH)
-if loaded_common_ingredients:
-    common_ingredients_set = set(loaded_common_ingredients)
-    print(f"Loaded {len(common_ingredients_set)} common ingredients.")
-else:
-    print("Failed to load common_ingredients_live.json. Application may not function correctly.")
-
-loaded_structured_ingredients = load_json_data(STRUCTURED_INGREDIENTS_FILE_PATH)
-if loaded_structured_ingredients:
-    structured_common_ingredients = loaded_structured_ingredients
-    print(f"Loaded {len(structured_common_ingredients)} structured common ingredients.")
-else:
-    print("Failed to load structured_common_ingredients_live.json. Application may not function correctly.")
+
+def _verified_key(base_ingredient, modifiers):
+    """
+    Builds the verified_ingredients_map key: the lowercased base ingredient plus its
+    lowercased modifiers in sorted order, so modifier order doesn't affect matching.
+    Used both when building the map and in /trust_report, so the two always agree.
+    Changing the key format requires bumping VERIFIED_MAP_CACHE_VERSION.
+    """
+    if not modifiers:
+        return (base_ingredient.lower(), ()) # Most parsed ingredients have no modifiers; skip the sort
+    if len(modifiers) == 1:
+        return (base_ingredient.lower(), (modifiers[0].lower(),))
+    if len(modifiers) == 2:
+        # Two modifiers is the next most common case: one compare instead of sorted()
+        a, b = modifiers[0].lower(), modifiers[1].lower()
+        return (base_ingredient.lower(), (a, b) if a <= b else (b, a))
+    return (base_ingredient.lower(), tuple(sorted([m.lower() for m in modifiers])))
+
+def _interned_key(key):
+    """Returns a _verified_key key with its strings interned. Only used at load time, not for request input."""
+    base_ingredient, modifiers = key
+    return (sys.intern(base_ingredient), tuple([sys.intern(m) for m in modifiers]))
+
+def build_search_index(ingredients):
+    """
+    Builds the /search_ingredient index: every lowercased 'base_ingredient' joined into
+    one newline-separated string, plus the offset where each ingredient's entry starts.
+    A substring search then runs as str.find over the whole blob in C instead of a
+    Python loop over every ingredient. Entries without a string base are left empty.
+    Also returns the ingredients that have a string base, which is what an empty
+    query matches, so no per-request isinstance checks are needed.
+    """
+    base_lower = [] # Parallel to ingredients
+    searchable = []
+    for ingredient in ingredients:
+        base = ingredient.get('base_ingredient')
+        if isinstance(base, str):
+            base_lower.append(base.lower())
+            searchable.append(ingredient)
+        else:
+            base_lower.append('')
+
+    starts = []
+    offset = 0
+    for base in base_lower:
+        starts.append(offset)
+        offset += len(base) + 1 # +1 for the '\n' separator
+    return '\n'.join(base_lower), starts, searchable
+
+
+def _load_all():
+    """
+    Loads all ingredient data files once on application startup and builds the derived
+    lookups (search index and verified ingredients map).
+    It's crucial that these files are in the specified 'data' directory
+    relative to your backend folder.
+    """
+    global common_ingredients_set, structured_common_ingredients
+    global structured_search_blob, structured_search_starts, structured_searchable
+
+    loaded_common_ingredients = load_json_data(INGREDIENTS_FILE_PATH)
+    if loaded_common_ingredients:
+        # A frozenset, since the set must not change after startup (its parse results are cached).
+        # Interning shares the strings with other structures that hold the same names.
+        common_ingredients_set = frozenset(map(sys.intern, loaded_common_ingredients))
+        print(f"Loaded {len(common_ingredients_set)} common ingredients.")
+    else:
+        print("Failed to load common_ingredients_live.json. Application may not function correctly.")
+
+    loaded_structured_ingredients = load_json_data(STRUCTURED_INGREDIENTS_FILE_PATH)
+    if loaded_structured_ingredients:
+        structured_common_ingredients = loaded_structured_ingredients
+        print(f"Loaded {len(structured_common_ingredients)} structured common ingredients.")
+    else:
+        print("Failed to load structured_common_ingredients_live.json. Application may not function correctly.")
+    structured_search_blob, structured_search_starts, structured_searchable = build_search_index(structured_common_ingredients)
+
+    # The built map is cached too, so restarts skip both the JSON parse and the key building
+    cached_verified_map = load_pickle_cache(VERIFIED_INGREDIENTS_FILE_PATH, VERIFIED_MAP_CACHE_NAME)
+    if cached_verified_map:
+        verified_ingredients_map.update(cached_verified_map)
+        print(f"Loaded {len(verified_ingredients_map)} verified ingredients from cache.")
+        return
+
+    loaded_verified_ingredients = load_json_data(VERIFIED_INGREDIENTS_FILE_PATH)
+    if loaded_verified_ingredients:
+        # Key strings are interned so repeated names ("salt", "organic") share one object,
+        # which pickle's memo also preserves in the cached map
+        verified_ingredients_map.update({
+            _interned_key(_verified_key(ingredient.get('base_ingredient', ''), ingredient.get('modifiers', []))): ingredient
+            for ingredient in loaded_verified_ingredients
+        })
+        save_pickle_cache(VERIFIED_INGREDIENTS_FILE_PATH, verified_ingredients_map, VERIFIED_MAP_CACHE_NAME)
+        print(f"Loaded {len(verified_ingredients_map)} verified ingredients.")
+    else:
+        print("Failed to load structured_verified_ingredients_reparsed_v2.json. Trust report functionality may not work.")
+
+_load_all()
+
+# Generation configuration for structured output in /structured_response.
+# Built once at import instead of on every request, since the schema never changes.
+STRUCTURED_RESPONSE_GENERATION_CONFIG = {
+    "responseMimeType": "application/json",
+    "responseSchema": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "original_string": {"type": "STRING"},
+                "base_ingredient": {"type": "STRING"},
+                "modifiers": {"type": "ARRAY", "items": {"type": "STRING"}},
+                "attributes": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "ingredient_type": {"type": "STRING"},
+                        "trust_report_category": {"type": "STRING"}
+                    }
+                },
+                "parenthetical_info": {"type": "OBJECT"},
+                "unusual_punctuation_found": {"type": "ARRAY", "items": {"type": "STRING"}}
+            },
+            "propertyOrdering": [
+                "original_string", "base_ingredient", "modifiers",
+                "attributes", "parenthetical_info", "unusual_punctuation_found"
+            ]
+        }
+    }
+}
 
 # --- Ingredient Parsing Integration ---
 # Import the ingredient_parser module.
@@ -104,6 +303,22 @@ except ImportError:
     # For now, we'll just print the error and let the app continue, though this endpoint will fail.
 
 
+@lru_cache(maxsize=8192)
+def _parse_with_global_set_cached(ingredient_string):
+    return parse_ingredient_string(ingredient_string, common_ingredients_set)
+
+def parse_with_global_set(ingredient_string):
+    """
+    Parses an ingredient string against the globally loaded common_ingredients_set.
+    The same ingredient strings recur across requests, so results for string inputs are
+    cached; this is safe because common_ingredients_set is a frozenset set at startup. Cached
+    results are shared between requests, so callers must not modify them.
+    """
+    if not isinstance(ingredient_string, str):
+        return parse_ingredient_string(ingredient_string, common_ingredients_set) # Unhashable inputs bypass the cache
+    return _parse_with_global_set_cached(ingredient_string)
+
+
 # --- Routes ---
 
 @app.route('/')
@@ -143,12 +358,13 @@ def parse_ingredient():
     # If the client sends a common_ingredients_set, it will override the global one for this request.
     # This allows for flexibility if the client has a more up-to-date set.
     request_common_ingredients_set = set(data.get('common_ingredients_set', []))
-    if not request_common_ingredients_set:
-        request_common_ingredients_set = common_ingredients_set
 
     try:
-        parsed_data = parse_ingredient_string(ingredient_string, request_common_ingredients_set)
-        return jsonify(parsed_data)
+        if request_common_ingredients_set:
+            parsed_data = parse_ingredient_string(ingredient_string, request_common_ingredients_set)
+        else:
+            parsed_data = parse_with_global_set(ingredient_string)
+        return json_response(parsed_data)
     except Exception as e:
         print(f"Error parsing ingredient: {e}")
         return jsonify({"error": f"Failed to parse ingredient: {str(e)}"}), 500
@@ -167,16 +383,24 @@ def search_ingredient():
     search_query = data['query'].lower()
     results = []
 
-    # Iterate through structured_common_ingredients and find matches
-    # This is a simple substring search for demonstration.
-    # For larger datasets, consider more optimized search solutions (e.g., indexing).
-    for ingredient in structured_common_ingredients:
-        # Ensure 'base_ingredient' exists and is a string before attempting to lower()
-        if 'base_ingredient' in ingredient and isinstance(ingredient['base_ingredient'], str):
-            if search_query in ingredient['base_ingredient'].lower():
-                results.append(ingredient)
-
-    return jsonify(results)
+    if not search_query:
+        return json_response(structured_searchable) # Every string base_ingredient contains ''
+    if '\n' in search_query:
+        return json_response(results) # Can't occur inside a single base_ingredient
+
+    # Scan the prebuilt blob with str.find; each hit is mapped back to its ingredient by
+    # offset, and the scan resumes at the next entry so an ingredient is returned once.
+    blob = structured_search_blob
+    starts = structured_search_starts
+    pos = blob.find(search_query)
+    while pos != -1:
+        index = bisect.bisect_right(starts, pos) - 1
+        results.append(structured_common_ingredients[index])
+        if index + 1 == len(starts):
+            break
+        pos = blob.find(search_query, starts[index + 1])
+
+    return json_response(results)
 
 @app.route('/generate_image', methods=['POST'])
 def generate_image():
@@ -185,7 +409,7 @@ def generate_image():
     Expects a JSON payload with a 'prompt' string.
     Returns a base64 encoded image URL.
     """
-    if not vertex_ai_initialized:
+    if not vertex_ai_initialized():
         return jsonify({"error": "Vertex AI not initialized. Check server configuration."}), 500
 
     data = request.get_json()
@@ -195,8 +419,7 @@ def generate_image():
     prompt = data['prompt']
 
     try:
-        # Use the pre-initialized imagen_model
-        response = imagen_model.generate_content(prompt)
+        response = _get_imagen_model().generate_content(prompt)
 
         if response.candidates and len(response.candidates) > 0 and \
            response.candidates[0].content and \
@@ -224,7 +447,7 @@ def generate_text():
     Expects a JSON payload with a 'prompt' string.
     Returns the generated text.
     """
-    if not vertex_ai_initialized:
+    if not vertex_ai_initialized():
         return jsonify({"error": "Vertex AI not initialized. Check server configuration."}), 500
 
     data = request.get_json()
@@ -234,8 +457,7 @@ def generate_text():
     prompt = data['prompt']
 
     try:
-        # Use the pre-initialized gemini_flash_model
-        response = gemini_flash_model.generate_content(prompt)
+        response = _get_gemini_flash_model().generate_content(prompt)
 
         if response.text:
             return jsonify({"generated_text": response.text})
@@ -253,7 +475,7 @@ def understand_image():
     Expects a POST request with 'image' (file) and 'prompt' (string) in the form data.
     Uses the Gemini model to analyze the image based on the provided prompt and returns the text response.
     """
-    if not vertex_ai_initialized:
+    if not vertex_ai_initialized():
         return jsonify({"error": "Vertex AI not initialized. Check server configuration."}), 500
 
     if 'image' not in request.files:
@@ -268,12 +490,13 @@ def understand_image():
         return jsonify({"error": "No selected image file"}), 400
 
     try:
+        # Part.from_data needs bytes, so the upload is read once; its size is bounded by MAX_CONTENT_LENGTH
         image_data = image_file.read()
+        from vertexai.generative_models import Part # Vertex AI is already imported by vertex_ai_initialized()
         image_part = Part.from_data(data=image_data, mime_type=image_file.mimetype)
 
-        # Use the pre-initialized gemini_flash_model
         contents = [prompt_text, image_part]
-        response = gemini_flash_model.generate_content(contents)
+        response = _get_gemini_flash_model().generate_content(contents)
 
         generated_text = response.text
         return jsonify({"response": generated_text})
@@ -290,7 +513,7 @@ def structured_response():
     Expects a JSON payload with a 'prompt' string.
     Returns a JSON object based on the defined responseSchema.
     """
-    if not vertex_ai_initialized:
+    if not vertex_ai_initialized():
         return jsonify({"error": "Vertex AI not initialized. Check server configuration."}), 500
 
     data = request.get_json()
@@ -299,46 +522,16 @@ def structured_response():
 
     prompt = data['prompt']
 
-    # Define the generation configuration for structured output
-    generation_config = {
-        "responseMimeType": "application/json",
-        "responseSchema": {
-            "type": "ARRAY",
-            "items": {
-                "type": "OBJECT",
-                "properties": {
-                    "original_string": {"type": "STRING"},
-                    "base_ingredient": {"type": "STRING"},
-                    "modifiers": {"type": "ARRAY", "items": {"type": "STRING"}},
-                    "attributes": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "ingredient_type": {"type": "STRING"},
-                            "trust_report_category": {"type": "STRING"}
-                        }
-                    },
-                    "parenthetical_info": {"type": "OBJECT"},
-                    "unusual_punctuation_found": {"type": "ARRAY", "items": {"type": "STRING"}}
-                },
-                "propertyOrdering": [
-                    "original_string", "base_ingredient", "modifiers",
-                    "attributes", "parenthetical_info", "unusual_punctuation_found"
-                ]
-            }
-        }
-    }
-
     try:
-        # Use the pre-initialized gemini_flash_model
-        response = gemini_flash_model.generate_content(
+        response = _get_gemini_flash_model().generate_content(
             contents=[{"role": "user", "parts": [{"text": prompt}]}],
-            generation_config=generation_config
+            generation_config=STRUCTURED_RESPONSE_GENERATION_CONFIG
         )
 
         if response.text:
             parsed_json_str = response.text
-            parsed_data = json.loads(parsed_json_str)
-            return jsonify({"parsedIngredients": parsed_data})
+            parsed_data = orjson.loads(parsed_json_str) # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            return json_response({"parsedIngredients": parsed_data})
         else:
             return jsonify({"error": "Structured response failed or returned no data"}), 500
     except json.JSONDecodeError as e:
@@ -349,90 +542,16 @@ def structured_response():
         return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
-@app.errorhandler(500)
-def internal_server_error(e):
-    """
-    Global error handler for 500 Internal Server Errors.
-    This catches any unhandled exceptions in the application and returns a standardized JSON error response.
-    """
-    # Log the exception for debugging purposes.
-    # Using app.logger.error requires proper Flask logging setup, for simplicity, using print for now.
-    print(f"Internal Server Error: {e}")
-    return jsonify({"error": "An unexpected error occurred. Please try again later.", "details": str(e)}), 500
-
-# You might also want to add a 404 handler for unknown routes, but we can add that later if needed.
-# @app.errorhandler(404)
-# def not_found_error(error):
-#     return jsonify({"error": "Not Found", "message": "The requested URL was not found on the server."}), 404
-
-if __name__ == '__main__':
-    # Run the Flask application
-    # debug=True allows for automatic reloading on code changes and provides a debugger.
-    # In production, set debug=False.
-    app.run(debug=True, port=5000)
-
-    # --- Configuration and Data Loading ---
-# Define paths for ingredient data files
-# These paths are relative to the directory where app.py is run.
-INGREDIENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'common_ingredients_live.json')
-STRUCTURED_INGREDIENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'structured_common_ingredients_live.json')
-VERIFIED_INGREDIENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'structured_verified_ingredients_reparsed_v2.json')
-
-
-# Global variables to store loaded data
-common_ingredients_set = set()
-structured_common_ingredients = []
-verified_ingredients_map = {} # New global variable for verified ingredients
-
-
-def load_json_data(file_path):
-    """
-    Loads JSON data from a specified file path.
-    Returns the loaded data or None if an error occurs.
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Error: File not found at {file_path}")
-        return None
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {file_path}")
-        return None
-    except Exception as e:
-        print(f"An unexpected error occurred while loading {file_path}: {e}")
-        return None
-
-
-# Load ingredient data on application startup
-# It's crucial that these files are in the specified 'data' directory
-# relative to your backend folder.
-loaded_common_ingredients = load_json_data(INGREDIENTS_FILE_PATH)
-if loaded_common_ingredients:
-    common_ingredients_set = set(loaded_common_ingredients)
-    print(f"Loaded {len(common_ingredients_set)} common ingredients.")
-else:
-    print("Failed to load common_ingredients_live.json. Application may not function correctly.")
-
-loaded_structured_ingredients = load_json_data(STRUCTURED_INGREDIENTS_FILE_PATH)
-if loaded_structured_ingredients:
-    structured_common_ingredients = loaded_structured_ingredients
-    print(f"Loaded {len(structured_common_ingredients)} structured common ingredients.")
-else:
-    print("Failed to load structured_common_ingredients_live.json. Application may not function correctly.")
-
-loaded_verified_ingredients = load_json_data(VERIFIED_INGREDIENTS_FILE_PATH)
-if loaded_verified_ingredients:
-    for ingredient in loaded_verified_ingredients:
-        base = ingredient.get('base_ingredient', '').lower()
-        mods = tuple(sorted([m.lower() for m in ingredient.get('modifiers', [])]))
-        verified_ingredients_map[(base, mods)] = ingredient
-    print(f"Loaded {len(verified_ingredients_map)} verified ingredients.")
-else:
-    print("Failed to load structured_verified_ingredients_reparsed_v2.json. Trust report functionality may not work.")
-
-
 # --- New Endpoint for Trust Report ---
+def _verification_details(verified_info):
+    """Builds the trust report's verification_details for a verified ingredient."""
+    return {
+        "base_ingredient": verified_info.get('base_ingredient'),
+        "modifiers": verified_info.get('modifiers'),
+        "attributes": verified_info.get('attributes', {}),
+        "trust_report_category": verified_info.get('attributes', {}).get('trust_report_category', 'unknown')
+    }
+
 @app.route('/trust_report', methods=['POST'])
 def trust_report():
     """
@@ -448,10 +567,10 @@ def trust_report():
         return jsonify({"error": "Missing 'ingredient_string' in request body"}), 400
 
     ingredient_string = data['ingredient_string']
-    
+
     try:
-        # Parse the input ingredient string
-        parsed_data = parse_ingredient_string(ingredient_string, common_ingredients_set)
+        # Parse the input ingredient string; repeated inputs are served from the parse cache
+        parsed_data = parse_with_global_set(ingredient_string)
         
         report = {
             "original_string": ingredient_string,
@@ -462,28 +581,50 @@ def trust_report():
         }
 
         # Attempt to find the parsed ingredient in the verified map
-        base_ingredient = parsed_data.get('base_ingredient', '').lower()
-        modifiers = tuple(sorted([m.lower() for m in parsed_data.get('modifiers', [])]))
-        lookup_key = (base_ingredient, modifiers)
+        lookup_key = _verified_key(parsed_data.get('base_ingredient', ''), parsed_data.get('modifiers', []))
+        verified_info = verified_ingredients_map.get(lookup_key) # One probe instead of `in` then []
 
-        if lookup_key in verified_ingredients_map:
-            verified_info = verified_ingredients_map[lookup_key]
+        if verified_info is not None:
             report["is_verified"] = True
-            report["verification_details"] = {
-                "base_ingredient": verified_info.get('base_ingredient'),
-                "modifiers": verified_info.get('modifiers'),
-                "attributes": verified_info.get('attributes', {}),
-                "trust_report_category": verified_info.get('attributes', {}).get('trust_report_category', 'unknown')
-            }
+            report["verification_details"] = _verification_details(verified_info)
         else:
             report["verification_details"] = {
                 "message": "Ingredient not found in verified list. Trust report category is 'unknown' by default.",
                 "trust_report_category": parsed_data.get('attributes', {}).get('trust_report_category', 'unknown')
             }
 
-        return jsonify(report)
+        return json_response(report)
 
     except Exception as e:
         print(f"Error generating trust report for '{ingredient_string}': {e}")
         return jsonify({"error": f"Failed to generate trust report: {str(e)}"}), 500
 
+
+@app.errorhandler(500)
+def internal_server_error(e):
+    """
+    Global error handler for 500 Internal Server Errors.
+    This catches any unhandled exceptions in the application and returns a standardized JSON error response.
+    """
+    # Log the exception for debugging purposes.
+    # Using app.logger.error requires proper Flask logging setup, for simplicity, using print for now.
+    print(f"Internal Server Error: {e}")
+    return jsonify({"error": "An unexpected error occurred. Please try again later.", "details": str(e)}), 500
+
+@app.errorhandler(413)
+def request_entity_too_large(e):
+    """
+    Returned when a request body (typically an uploaded image) exceeds MAX_CONTENT_LENGTH.
+    """
+    return jsonify({"error": f"Request body too large. The limit is {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB."}), 413
+
+# You might also want to add a 404 handler for unknown routes, but we can add that later if needed.
+# @app.errorhandler(404)
+# def not_found_error(error):
+#     return jsonify({"error": "Not Found", "message": "The requested URL was not found on the server."}), 404
+
+if __name__ == '__main__':
+    # Run the Flask application
+    # debug=True allows for automatic reloading on code changes and provides a debugger.
+    # In production, set debug=False.
+    app.run(debug=True, port=5000)
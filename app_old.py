@@ -1,14 +1,37 @@
 import os
-import json
+import atexit
 import re  # Import re for regex operations
-from flask import Flask, request, jsonify
+import sys
+from flask import Flask, request, Response
 from flask_cors import CORS # Import Flask-Cors, already there but ensuring correct usage
+from flask_compress import Compress # gzip/br response compression
 import requests  # For making HTTP requests to USDA
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson  # Fast JSON encoding for API responses
 from airtable import Airtable  # For interacting with Airtable
-from datetime import datetime, timedelta # Import timedelta for date calculations
-from pprint import pprint  # For debugging, can be removed later
-import traceback  # For printing full tracebacks
+from datetime import datetime
+import logging
 import time
+import threading
+import heapq
+import hashlib
+import gzip
+import base64
+import binascii
+import zlib
+import pickle
+import sqlite3
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Request-path logging goes through the logger so messages are only formatted when enabled.
+# Set LOG_LEVEL=INFO (or DEBUG) to see the per-request trace locally.
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
+log = logging.getLogger(__name__)
 
 # --- Configuration ---
 # Load environment variables for sensitive API keys and IDs
@@ -30,34 +53,129 @@ COMMON_INGREDIENTS_DATA_FILE = os.path.join(
 GTIN_FDCID_MAP_FILE = os.path.join(
     os.path.dirname(__file__), "data", "gtin_map.json"
 ) # Path to your new GTIN-FDCID map
+# Prebuilt ingredient lookups are pickled here, keyed by a hash of the data files.
+# Bump LOOKUP_CACHE_VERSION whenever the way the lookups are built changes.
+LOOKUP_CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", ".cache")
+LOOKUP_CACHE_VERSION = 3
 
 # Airtable max rows for the free tier (for eviction logic)
 AIRTABLE_MAX_ROWS = 1000
-FRESHNESS_WINDOW_DAYS = 7 # Define freshness window in days
-FRESHNESS_BONUS = 5 # Define the bonus for fresh items
+FRESHNESS_WINDOW_DAYS = 7 # Define freshness window in days (decay time constant for the eviction utility)
+UTILITY_DECAY_SECONDS = FRESHNESS_WINDOW_DAYS * 24 * 60 * 60
+AIRTABLE_FLUSH_INTERVAL_SECONDS = 2 # How long cache-hit stat updates are buffered before a batch write
+AIRTABLE_BATCH_SIZE = 10 # Records per Airtable batch request; a full batch of inserts is written without waiting
+AIRTABLE_CACHE_TIMEOUT_SECONDS = 2 # How long a lookup waits on the cache check; past that the cache state is unknown
+# Request threads per worker (gunicorn.conf.py); each request-path pool gets this many workers
+# so a full set of concurrent requests never queues behind itself.
+REQUEST_THREADS = int(os.environ.get("GUNICORN_THREADS", "8"))
+# How often the in-memory eviction index is rebuilt from Airtable. Each worker process keeps its
+# own index, so this bounds drift from rows written by other workers or edited in Airtable.
+EVICTION_INDEX_RESYNC_SECONDS = 15 * 60
 
 app = Flask(__name__)
-# Configure CORS for all origins, allowing POST requests and Content-Type header
-CORS(app, resources={r"/api/*": {"origins": "*"}}) # Explicitly allow all origins for API routes
+# Configure CORS for all origins, allowing POST requests and Content-Type header.
+# flask_cors answers preflight OPTIONS requests and adds the CORS headers to every response.
+CORS(app, resources={r"/api/*": {"origins": "*"}}, methods=['POST', 'OPTIONS'],
+     allow_headers=['Content-Type'], send_wildcard=True)
+# Compress JSON responses (ingredient breakdowns repeat names and keys heavily) when the
+# client sends Accept-Encoding; small responses are left as-is.
+Compress(app)
 
 # Initialize Airtable client globally
 airtable = None
 if AIRTABLE_BASE_ID and AIRTABLE_TABLE_NAME and AIRTABLE_API_KEY:
     try:
         airtable = Airtable(AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME, AIRTABLE_API_KEY)
-        print("[Backend Init] Airtable client initialized successfully.")
+        log.info("[Backend Init] Airtable client initialized successfully.")
     except Exception as e:
-        print(f"[Backend Init] Error initializing Airtable client: {e}")
+        log.error("[Backend Init] Error initializing Airtable client: %s", e)
+
+# --- Buffered Airtable usage-stat updates ---
+# Cache hits bump lookup_count/last_access. Instead of one PATCH per hit (which queues
+# behind Airtable's 5 req/sec limit), updates are buffered per record and flushed
+# with batch_update, which sends up to 10 records per request.
+_pending_updates = {}  # Maps Airtable record_id to the fields to PATCH
+_pending_updates_lock = threading.Lock()
+_flush_timer = None
+
+# New cache rows are buffered the same way and written with batch_insert (10 records per
+# request), so a burst of cache misses doesn't cost one POST per GTIN. Evicted rows are
+# buffered with them and removed with batch_delete just before the inserts are written.
+_pending_inserts = {}  # Maps GTIN to (fields of the record to insert, decoded copy for the in-process cache)
+_pending_deletes = []  # Airtable record_ids evicted from the index, not yet deleted
+_pending_inserts_lock = threading.Lock()  # Guards _pending_inserts and _pending_deletes
+_insert_flush_timer = None
+
+# Background executor for Airtable cache writes, so cache-miss responses don't wait
+# on the count -> evict -> store round-trips.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="airtable-writer")
+
+# Executors for the request-path lookups. The Airtable cache check and the USDA fetch run
+# concurrently so a cache miss doesn't pay for the Airtable round-trip before USDA starts.
+# Each request takes a slot in both, so they're separate pools sized to the request
+# threads: otherwise cache checks queue behind USDA fetches and time out under load.
+_cache_check_pool = ThreadPoolExecutor(max_workers=REQUEST_THREADS, thread_name_prefix="airtable-cache-check")
+_usda_pool = ThreadPoolExecutor(max_workers=REQUEST_THREADS, thread_name_prefix="usda-fetch")
+
+# Single-flight map for USDA fetches. Concurrent scans of the same GTIN share one
+# in-flight future, so a burst of duplicates costs one USDA call and one Airtable write.
+_INFLIGHT = {}  # Maps GTIN to [Future of its USDA fetch, number of followers waiting on it]
+_INFLIGHT_LOCK = threading.Lock()
+
+# --- In-memory eviction index ---
+# Row count and a min-heap of (utility_score, record_id, lookup_count, last_access_epoch), warmed with a
+# single Airtable scan and then kept current on store/delete/cache hit, so a cache miss
+# no longer needs two full-table scans. Stale heap entries are skipped lazily: an entry
+# is live only if it matches _eviction_entries[record_id].
+_row_count = None  # None until the index has been warmed
+_eviction_heap = []
+_eviction_entries = {}  # Maps record_id to its current heap entry
+_eviction_lock = threading.Lock()
+_eviction_index_synced_at = 0.0  # time.monotonic() of the last warm-up scan
+
+# --- In-process GTIN cache ---
+# LRU of recently seen cache rows in front of Airtable, so repeat lookups skip the
+# Airtable round-trip. Maps gtin to (record_id, decoded fields, expires_at). Entries
+# expire after GTIN_LRU_TTL_SECONDS so rows changed or evicted by other workers are
+# eventually re-read from Airtable.
+GTIN_LRU_MAX_ENTRIES = 2048
+GTIN_LRU_TTL_SECONDS = float(os.environ.get('GTIN_LRU_TTL_SECONDS', 300))
+_GTIN_LRU = OrderedDict()
+_gtin_lru_lock = threading.Lock()
 
 # USDA API base URL for FDC ID lookup (used for the reliable FDC ID lookup)
 USDA_GET_FOOD_BY_FDCID_URL = 'https://api.nal.usda.gov/fdc/v1/food/'
+# Nutrient numbers to return with a food record (208 = Energy). The lookup never reads
+# nutrients, so this just keeps the response small. format=abridged would also drop
+# the ingredients string, so it can't be used here.
+USDA_NUTRIENTS_FILTER = '208'
+
+# Shared USDA HTTP session: keeps TLS connections alive across requests instead of
+# reconnecting per lookup, and retries transient failures with a short backoff.
+_usda_session = requests.Session()
+_usda_session.mount('https://', HTTPAdapter(
+    pool_connections=10, pool_maxsize=50,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',), raise_on_status=False)
+))
+
+# Details kept per FDA substance; a namedtuple rather than a dict per entry to keep thousands of them compact.
+# Its sequence fields are tuples too, so entries (and the technical-effect tuples they share) stay immutable.
+FdaSubstanceDetails = namedtuple('FdaSubstanceDetails', [
+    'original_name', 'used_for_raw', 'used_for_categories', 'used_for_colors',
+    'individual_technical_effects', 'other_names', 'cas_no'
+])
 
 # --- Global Lookups (will be populated once on app startup) ---
 ADDITIVES_LOOKUP = {}  # Maps normalized alias to normalized canonical FDA substance name
 COMMON_INGREDIENTS_LOOKUP = {}  # Maps normalized common ingredient to its preferred original casing
 COMMON_FDA_SUBSTANCES_SET = set()  # Stores normalized canonical FDA substance names that are also common ingredients
-GTIN_TO_FDCID_MAP = {} # New: Maps GTIN to FDC ID
-FDA_SUBSTANCE_DETAILS = {} # New: Stores full details for FDA substances (used_for, other_names, cas_no)
+GTIN_TO_FDCID_MAP = {} # New: Maps GTIN to FDC ID. Only filled if the sqlite copy below can't be used
+_gtin_db = None # Read-only sqlite copy of the GTIN-to-FDC ID map; see _open_gtin_db
+_gtin_db_lock = threading.Lock()
+FDA_SUBSTANCE_DETAILS = {} # New: Stores full details for FDA substances (used_for, other_names, cas_no) as FdaSubstanceDetails
+INGREDIENT_PHRASE_TRIE = {} # Word-level trie over ADDITIVES_LOOKUP and COMMON_INGREDIENTS_LOOKUP keys, used by analyze_ingredients
+_TRIE_VALUE_KEY = ' ' # Trie node key holding a complete phrase's value; can't clash with a word (words never contain ' ')
 
 # --- NEW: Mapping for Technical Effect Categories and Colors (more structured) ---
 # This dictionary maps keywords found in "Used for (Technical Effect)" to
@@ -135,21 +253,46 @@ TECHNICAL_EFFECT_CATEGORIES = {
     "MALTODEXTRIN": {"category": "Thickener", "color": "bg-purple-100 text-purple-800"}, # Specific for maltodextrin, now using structured format
 }
 
+# TECHNICAL_EFFECT_CATEGORIES sorted longest keyword first, so longer keywords match first
+# (e.g. "flavoring agent or adjuvant" before "flavoring agent"). Sorted once here rather than
+# on every get_technical_effect_categories call.
+_TECHNICAL_EFFECT_CATEGORIES_LONGEST_FIRST = sorted(
+    TECHNICAL_EFFECT_CATEGORIES.items(), key=lambda item: len(item[0]), reverse=True
+)
 
+# --- Precompiled regex patterns (compiled once at import rather than on every call) ---
+# Used by get_technical_effect_categories
+_EFFECT_SPLIT_RE = re.compile(r',\s*|<br\s*/>', re.IGNORECASE)
+# Used by load_data_lookups: characters dropped from canonical names, and from aliases/common ingredients
+_CANONICAL_DISALLOWED_RE = re.compile(r'[^a-z0-9\s\&\.\-#]')
+_ALIAS_DISALLOWED_RE = re.compile(r'[^a-z0-9\s\&\.\-#\(\)]')
+# Used by analyze_ingredients
+_INGREDIENTS_PREFIX_RE = re.compile(r'^(?:ingredients|contains|ingredient list|ingredients list):?\s*', re.IGNORECASE)
+_AND_OR_RE = re.compile(r'\s+and/or\s+', re.IGNORECASE)
+_ROLE_PARENTHETICAL_RE = re.compile(r'\s*\((?:color|flavour|flavor|emulsifier|stabilizer|thickener|preservative|antioxidant|acidifier|sweetener|gelling agent|firming agent|nutrient|vitamin [a-z0-9]+)\)\s*', re.IGNORECASE)
+_VITAMIN_B_BRACKET_RE = re.compile(r'\s*\[vitamin b\d\]\s*', re.IGNORECASE)
+# Finds the parenthesis characters for _split_parentheticals
+_PAREN_CHAR_RE = re.compile(r'[()]')
+_COMPONENT_SPLIT_RE = re.compile(r',\s*|;\s*')
+_SUB_COMPONENT_SPLIT_RE = re.compile(r',\s*| and\s*')
+
+@lru_cache(maxsize=None)
 def get_technical_effect_categories(raw_effects_string):
     """
     Parses a raw 'Used for (Technical Effect)' string and maps it to
     a list of user-friendly categories and their colors.
+    Memoized, since many FDA substances share the same effect string; the results are
+    returned as tuples because the cached objects are shared between FDA_SUBSTANCE_DETAILS entries.
     """
     categories_found = []
     colors_found = []
     individual_technical_effects = [] # For detailed display if needed
 
     if not raw_effects_string:
-        return [], [], []
+        return (), (), ()
 
     # Split by common delimiters and clean up
-    individual_effect_phrases = re.split(r',\s*|<br\s*/>', raw_effects_string, flags=re.IGNORECASE)
+    individual_effect_phrases = _EFFECT_SPLIT_RE.split(raw_effects_string)
     
     # Use sets to store unique categories and colors to avoid duplicates
     unique_categories = set()
@@ -163,9 +306,8 @@ def get_technical_effect_categories(raw_effects_string):
         phrase_color = "bg-gray-100 text-gray-800"
         matched = False
 
-        # Iterate through the defined TECHNICAL_EFFECT_CATEGORIES to find a match.
-        # Sort by length in reverse to match longer keywords first (e.g., "flavoring agent or adjuvant" before "flavoring agent").
-        for keyword, details in sorted(TECHNICAL_EFFECT_CATEGORIES.items(), key=lambda item: len(item[0]), reverse=True):
+        # Iterate through the defined TECHNICAL_EFFECT_CATEGORIES, longest keyword first, to find a match.
+        for keyword, details in _TECHNICAL_EFFECT_CATEGORIES_LONGEST_FIRST:
             if keyword in cleaned_phrase:
                 phrase_category = details["category"]
                 phrase_color = details["color"]
@@ -187,82 +329,166 @@ def get_technical_effect_categories(raw_effects_string):
                 "color": phrase_color
             })
 
-    return categories_found, colors_found, individual_technical_effects
+    return tuple(categories_found), tuple(colors_found), tuple(individual_technical_effects)
 
 
-def load_data_lookups():
+def _build_phrase_trie(additives_lookup, common_lookup):
     """
-    Loads all necessary lookup data (additives, common ingredients, GTIN-FDCID map)
-    from JSON files and builds the optimized lookup dictionaries/sets.
-    This function should be called once at application startup.
+    Builds one word-level trie over both lookups: nested dicts keyed by word. A node that
+    completes a phrase holds [additive_canonical, common_original_casing] under _TRIE_VALUE_KEY,
+    with None for whichever lookup doesn't contain the phrase.
+    """
+    trie = {}
+    for slot, lookup in enumerate((additives_lookup, common_lookup)):
+        for phrase, value in lookup.items():
+            node = trie
+            for word in phrase.split(' '):
+                node = node.setdefault(sys.intern(word), {}) # The same words recur across thousands of phrases
+            node.setdefault(_TRIE_VALUE_KEY, [None, None])[slot] = value
+    return trie
+
+def _match_phrases(words):
     """
-    global ADDITIVES_LOOKUP, COMMON_INGREDIENTS_LOOKUP, COMMON_FDA_SUBSTANCES_SET, GTIN_TO_FDCID_MAP, FDA_SUBSTANCE_DETAILS
+    Finds a component's FDA additive and common ingredient matches in a single trie walk.
+    Returns (additive_canonical, None) for the leftmost, then longest, additive phrase if there
+    is one; otherwise (None, common_original_casing) for the leftmost-longest common ingredient
+    phrase, or (None, None). Same result as checking every " ".join(words[i:j]) against
+    ADDITIVES_LOOKUP first and then COMMON_INGREDIENTS_LOOKUP, without the joins or second pass.
+    """
+    common_match = None
+    for i in range(len(words)):
+        node = INGREDIENT_PHRASE_TRIE
+        additive_at_i = None
+        common_at_i = None
+        for k in range(i, len(words)):
+            node = node.get(words[k])
+            if node is None:
+                break
+            values = node.get(_TRIE_VALUE_KEY)
+            if values:
+                if values[0]:
+                    additive_at_i = values[0]
+                if values[1]:
+                    common_at_i = values[1]
+        if additive_at_i:
+            return additive_at_i, None
+        if common_match is None:
+            common_match = common_at_i
+    return None, common_match
+
+
+def _lookup_cache_path():
+    """
+    Returns the pickle path for the built ingredient lookups, keyed by a hash of the data
+    files and LOOKUP_CACHE_VERSION, or None if the data files can't be read.
+    """
+    digest = hashlib.sha256(str(LOOKUP_CACHE_VERSION).encode())
+    try:
+        for path in (ADDITIVES_DATA_FILE, COMMON_INGREDIENTS_DATA_FILE):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    except OSError:
+        return None
+    return os.path.join(LOOKUP_CACHE_DIR, f"lookups-{digest.hexdigest()[:16]}.pkl")
+
+def _load_lookup_cache(cache_path):
+    """Loads prebuilt ingredient lookups into the globals. Returns False if there is no usable cache."""
+    global ADDITIVES_LOOKUP, COMMON_INGREDIENTS_LOOKUP, COMMON_FDA_SUBSTANCES_SET, FDA_SUBSTANCE_DETAILS
+    global INGREDIENT_PHRASE_TRIE
+    if not cache_path or not os.path.exists(cache_path):
+        return False
+    try:
+        with open(cache_path, 'rb') as f:
+            (ADDITIVES_LOOKUP, COMMON_INGREDIENTS_LOOKUP, COMMON_FDA_SUBSTANCES_SET,
+             FDA_SUBSTANCE_DETAILS, INGREDIENT_PHRASE_TRIE) = pickle.load(f)
+    except Exception as e:
+        log.warning("[Backend Init] ⚠️ Ignoring unreadable lookup cache '%s': %s", cache_path, e)
+        return False
+    log.info("[Backend Init] ✅ Loaded prebuilt lookups from '%s': %s additive aliases, %s common ingredients.",
+             cache_path, len(ADDITIVES_LOOKUP), len(COMMON_INGREDIENTS_LOOKUP))
+    return True
+
+def _save_lookup_cache(cache_path):
+    """Pickles the built ingredient lookups for the next startup. Skipped if a data file failed to load."""
+    if not cache_path or not ADDITIVES_LOOKUP or not COMMON_INGREDIENTS_LOOKUP:
+        return
+    try:
+        os.makedirs(LOOKUP_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((ADDITIVES_LOOKUP, COMMON_INGREDIENTS_LOOKUP, COMMON_FDA_SUBSTANCES_SET,
+                         FDA_SUBSTANCE_DETAILS, INGREDIENT_PHRASE_TRIE), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path) # Atomic, so concurrent workers never read a partial file
+        log.info("[Backend Init] ✅ Saved prebuilt lookups to '%s'.", cache_path)
+    except Exception as e:
+        log.warning("[Backend Init] ⚠️ Could not save lookup cache '%s': %s", cache_path, e)
+
+@lru_cache(maxsize=131072)
+def _normalize_name(name, disallowed_re=_ALIAS_DISALLOWED_RE, fix_no=True):
+    """
+    Normalizes an additive or common ingredient name for use as a lookup key: lowercase,
+    characters matched by disallowed_re removed, whitespace collapsed and, if fix_no,
+    'no.' -> 'no '. Cached, since the same aliases recur across many FDA entries.
+    """
+    # split()/join strips and collapses whitespace in one pass (same result as strip() + \s+ -> ' ')
+    normalized = ' '.join(disallowed_re.sub('', name.lower()).split())
+    if fix_no:
+        normalized = normalized.replace('no.', 'no ')
+    return normalized
+
+# Extra aliases added for any FDA substance whose normalized canonical name contains the
+# substring, for names that labels commonly use but the FDA data doesn't list.
+_CANONICAL_ALIAS_EXTRAS = (
+    ("fd&c red no 40", ("red 40", "red #40")),
+    ("fd&c yellow no 5", ("yellow 5", "yellow #5")),
+    ("fd&c blue no 1", ("blue 1", "blue #1")),
+    ("caramel", ("caramel color",)),
+    ("phosphoric acid", ("phosphoric acid",)),
+    ("sodium bicarbonate", ("baking soda",)),
+    ("sucrose", ("sugar", "cane sugar", "pure cane sugar")),
+    ("sodium chloride", ("salt",)),
+    ("mono- and diglycerides", ("mono and diglycerides",)),
+    ("cellulose gum", ("cellulose gum", "carboxymethylcellulose", "cmc")),
+    ("annatto", ("annatto (color)",)),
+    ("garlic", ("garlic", "dehydrated garlic", "garlic powder")),
+)
+
+def _build_ingredient_lookups():
+    """
+    Builds ADDITIVES_LOOKUP, FDA_SUBSTANCE_DETAILS, COMMON_INGREDIENTS_LOOKUP,
+    COMMON_FDA_SUBSTANCES_SET and INGREDIENT_PHRASE_TRIE from the JSON data files.
+    """
+    global INGREDIENT_PHRASE_TRIE
 
     # Load additive data
-    print(f"[Backend Init] Attempting to load additives data from: {ADDITIVES_DATA_FILE}")
+    log.info("[Backend Init] Attempting to load additives data from: %s", ADDITIVES_DATA_FILE)
     try:
-        with open(ADDITIVES_DATA_FILE, 'r', encoding='utf-8') as f:
-            additives_raw = json.load(f)
+        with open(ADDITIVES_DATA_FILE, 'rb') as f:
+            additives_raw = orjson.loads(f.read())
 
         for entry in additives_raw:
             canonical_name = entry.get("Substance Name (Heading)")
             if not canonical_name:
                 continue
 
-            normalized_canonical_name_for_key = re.sub(r'[^a-z0-9\s\&\.\-#]', '', canonical_name.lower()).strip()
-            normalized_canonical_name_for_key = re.sub(r'\s+', ' ', normalized_canonical_name_for_key)
-            normalized_canonical_name_for_key = normalized_canonical_name_for_key.replace('no.', 'no ')
+            # Interned so the key shared by ADDITIVES_LOOKUP values, FDA_SUBSTANCE_DETAILS and the
+            # trie is one string object, as are aliases that equal another entry's name
+            normalized_canonical_name_for_key = sys.intern(_normalize_name(canonical_name, _CANONICAL_DISALLOWED_RE))
 
-            names_to_add = set()
+            # A list rather than a set: duplicates just overwrite the same ADDITIVES_LOOKUP key below
+            names_to_add = [canonical_name, normalized_canonical_name_for_key]
             if entry.get("Substance"):
-                names_to_add.add(entry.get("Substance"))
-            names_to_add.add(canonical_name)
-            names_to_add.add(normalized_canonical_name_for_key)
-            names_to_add.update(entry.get("Other Names", []))
+                names_to_add.append(entry.get("Substance"))
+            names_to_add.extend(entry.get("Other Names", []))
 
             # --- Explicitly add common aliases for problematic cases ---
-            if "fd&c red no 40" in normalized_canonical_name_for_key:
-                names_to_add.add("red 40")
-                names_to_add.add("red #40")
-            if "fd&c yellow no 5" in normalized_canonical_name_for_key:
-                names_to_add.add("yellow 5")
-                names_to_add.add("yellow #5")
-            if "fd&c blue no 1" in normalized_canonical_name_for_key:
-                names_to_add.add("blue 1")
-                names_to_add.add("blue #1")
-
-            if "caramel" in normalized_canonical_name_for_key:
-                names_to_add.add("caramel color")
-            if "phosphoric acid" in normalized_canonical_name_for_key:
-                names_to_add.add("phosphoric acid")
-            if "sodium bicarbonate" in normalized_canonical_name_for_key:
-                names_to_add.add("baking soda")
-            if "sucrose" in normalized_canonical_name_for_key:
-                names_to_add.add("sugar")
-                names_to_add.add("cane sugar")
-                names_to_add.add("pure cane sugar")
-            if "sodium chloride" in normalized_canonical_name_for_key:
-                names_to_add.add("salt")
-            if "mono- and diglycerides" in normalized_canonical_name_for_key:
-                names_to_add.add("mono and diglycerides")
-            if "cellulose gum" in normalized_canonical_name_for_key:
-                names_to_add.add("cellulose gum")
-                names_to_add.add("carboxymethylcellulose")
-                names_to_add.add("cmc")
-            if "annatto" in normalized_canonical_name_for_key:
-                names_to_add.add("annatto (color)")
-            if "garlic" in normalized_canonical_name_for_key:
-                names_to_add.add("garlic")
-                names_to_add.add("dehydrated garlic")
-                names_to_add.add("garlic powder")
-
+            for canonical_substring, extra_aliases in _CANONICAL_ALIAS_EXTRAS:
+                if canonical_substring in normalized_canonical_name_for_key:
+                    names_to_add.extend(extra_aliases)
 
             for name in names_to_add:
                 if name:
-                    normalized_alias = re.sub(r'[^a-z0-9\s\&\.\-#\(\)]', '', name.lower()).strip()
-                    normalized_alias = re.sub(r'\s+', ' ', normalized_alias)
-                    normalized_alias = normalized_alias.replace('no.', 'no ')
-
+                    normalized_alias = sys.intern(_normalize_name(name))
                     if normalized_alias:
                         ADDITIVES_LOOKUP[normalized_alias] = normalized_canonical_name_for_key
             
@@ -270,65 +496,147 @@ def load_data_lookups():
             raw_used_for = entry.get("Used for (Technical Effect)", "").strip()
             categories, colors, individual_effects = get_technical_effect_categories(raw_used_for)
 
-            FDA_SUBSTANCE_DETAILS[normalized_canonical_name_for_key] = {
-                "original_name": canonical_name,
-                "used_for_raw": raw_used_for,
-                "used_for_categories": categories,
-                "used_for_colors": colors, # Store colors directly for frontend
-                "individual_technical_effects": individual_effects, # Store individual effects
-                "other_names": entry.get("Other Names", []),
-                "cas_no": entry.get("CAS Reg No (or other ID)", "")
-            }
+            FDA_SUBSTANCE_DETAILS[normalized_canonical_name_for_key] = FdaSubstanceDetails(
+                original_name=canonical_name,
+                used_for_raw=raw_used_for,
+                used_for_categories=categories,
+                used_for_colors=colors, # Store colors directly for frontend
+                individual_technical_effects=individual_effects, # Store individual effects
+                other_names=tuple(entry.get("Other Names", ())),
+                cas_no=entry.get("CAS Reg No (or other ID)", "")
+            )
 
 
-        print(f"[Backend Init] ✅ Successfully loaded {len(additives_raw)} additives and built lookup with {len(ADDITIVES_LOOKUP)} aliases.")
+        log.info("[Backend Init] ✅ Successfully loaded %s additives and built lookup with %s aliases.", len(additives_raw), len(ADDITIVES_LOOKUP))
 
     except FileNotFoundError:
-        print(f"[Backend Init] ❌ Error: Additives data file not found at '{ADDITIVES_DATA_FILE}'. Additive lookup will not work.")
-    except json.JSONDecodeError as e:
-        print(f"[Backend Init] ❌ Error decoding JSON from '{ADDITIVES_DATA_FILE}': {e}")
+        log.error("[Backend Init] ❌ Error: Additives data file not found at '%s'. Additive lookup will not work.", ADDITIVES_DATA_FILE)
+    except orjson.JSONDecodeError as e:
+        log.error("[Backend Init] ❌ Error decoding JSON from '%s': %s", ADDITIVES_DATA_FILE, e)
     except Exception as e:
-        print(f"[Backend Init] ❌ An unexpected error occurred while loading additive data: {e}")
+        log.error("[Backend Init] ❌ An unexpected error occurred while loading additive data: %s", e)
 
     # Load common ingredients data
-    print(f"[Backend Init] Attempting to load common ingredients data from: {COMMON_INGREDIENTS_DATA_FILE}")
+    log.info("[Backend Init] Attempting to load common ingredients data from: %s", COMMON_INGREDIENTS_DATA_FILE)
     temp_common_ingredients_set = set() # Use a temporary set for initial loading
     try:
-        with open(COMMON_INGREDIENTS_DATA_FILE, 'r', encoding='utf-8') as f:
-            common_ingredients_raw = json.load(f)
+        with open(COMMON_INGREDIENTS_DATA_FILE, 'rb') as f:
+            common_ingredients_raw = orjson.loads(f.read())
 
         for ingredient in common_ingredients_raw:
-            normalized_ingredient = re.sub(r'[^a-z0-9\s\&\.\-#\(\)]', '', ingredient.lower()).strip()
-            normalized_ingredient = re.sub(r'\s+', ' ', normalized_ingredient)
+            normalized_ingredient = sys.intern(_normalize_name(ingredient, fix_no=False))
             COMMON_INGREDIENTS_LOOKUP[normalized_ingredient] = ingredient # Keep mapping to original casing
             temp_common_ingredients_set.add(normalized_ingredient) # Add to temp set for intersection
 
-        print(f"[Backend Init] ✅ Successfully loaded {len(common_ingredients_raw)} common ingredients into lookup.")
+        log.info("[Backend Init] ✅ Successfully loaded %s common ingredients into lookup.", len(common_ingredients_raw))
     except FileNotFoundError:
-        print(f"[Backend Init] ❌ Error: Common ingredients data file not found at '{COMMON_INGREDIENTS_DATA_FILE}'. Common ingredient lookup will not work.")
-    except json.JSONDecodeError as e:
-        print(f"[Backend Init] ❌ Error decoding JSON from '{COMMON_INGREDIENTS_DATA_FILE}': {e}")
+        log.error("[Backend Init] ❌ Error: Common ingredients data file not found at '%s'. Common ingredient lookup will not work.", COMMON_INGREDIENTS_DATA_FILE)
+    except orjson.JSONDecodeError as e:
+        log.error("[Backend Init] ❌ Error decoding JSON from '%s': %s", COMMON_INGREDIENTS_DATA_FILE, e)
     except Exception as e:
-        print(f"[Backend Init] ❌ An unexpected error occurred while loading common ingredient data: {e}")
+        log.error("[Backend Init] ❌ An unexpected error occurred while loading common ingredient data: %s", e)
+
+    # Populate COMMON_FDA_SUBSTANCES_SET: canonical FDA names that are also common ingredients
+    COMMON_FDA_SUBSTANCES_SET.update(temp_common_ingredients_set.intersection(ADDITIVES_LOOKUP.values()))
+    log.info("[Backend Init] Populated COMMON_FDA_SUBSTANCES_SET with %s entries.", len(COMMON_FDA_SUBSTANCES_SET))
+
+    # Build the phrase trie so analyze_ingredients can match names in one walk per word
+    INGREDIENT_PHRASE_TRIE = _build_phrase_trie(ADDITIVES_LOOKUP, COMMON_INGREDIENTS_LOOKUP)
+    log.info("[Backend Init] Built ingredient phrase trie with %s root words.", len(INGREDIENT_PHRASE_TRIE))
+    _normalize_name.cache_clear() # Only needed while building; free the cached keys
+    get_technical_effect_categories.cache_clear()
 
-    # Populate COMMON_FDA_SUBSTANCES_SET
-    for canonical_fda_name in set(ADDITIVES_LOOKUP.values()):
-        if canonical_fda_name in temp_common_ingredients_set:
-            COMMON_FDA_SUBSTANCES_SET.add(canonical_fda_name)
-    print(f"[Backend Init] Populated COMMON_FDA_SUBSTANCES_SET with {len(COMMON_FDA_SUBSTANCES_SET)} entries.")
 
-    # New: Load GTIN-to-FDC ID map
-    print(f"[Backend Init] Attempting to load GTIN-to-FDC ID map from: {GTIN_FDCID_MAP_FILE}")
+def _gtin_db_path():
+    """
+    Returns the sqlite path for the GTIN-to-FDC ID map, keyed by a hash of gtin_map.json,
+    or None if the file can't be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(GTIN_FDCID_MAP_FILE, 'rb') as f:
+            digest.update(f.read())
+    except OSError:
+        return None
+    return os.path.join(LOOKUP_CACHE_DIR, f"gtin_map-{digest.hexdigest()[:16]}.sqlite")
+
+def _build_gtin_db(db_path):
+    """Writes gtin_map.json into a single-table sqlite file at db_path, atomically."""
+    with open(GTIN_FDCID_MAP_FILE, 'rb') as f:
+        gtin_map = orjson.loads(f.read())
+    os.makedirs(LOOKUP_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE gtin (gtin TEXT PRIMARY KEY, fdc_id TEXT) WITHOUT ROWID")
+        conn.executemany("INSERT INTO gtin VALUES (?, ?)", gtin_map.items())
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path) # Atomic, so concurrent workers never open a partial file
+    return len(gtin_map)
+
+def _open_gtin_db():
+    """
+    Opens the sqlite copy of the GTIN-to-FDC ID map, building it from gtin_map.json first if
+    there isn't one for the current file contents. The map has ~460k entries; as a dict it costs
+    each worker ~100 MB and a full JSON parse at startup, while the sqlite file is paged in on demand.
+    Returns the connection, or None if the file couldn't be built or opened.
+    """
+    db_path = _gtin_db_path()
+    if not db_path:
+        return None
     try:
-        with open(GTIN_FDCID_MAP_FILE, 'r', encoding='utf-8') as f:
-            GTIN_TO_FDCID_MAP = json.load(f)
-        print(f"[Backend Init] ✅ Loaded {len(GTIN_TO_FDCID_MAP)} GTIN-to-FDC ID mappings.")
+        if not os.path.exists(db_path):
+            log.info("[Backend Init] Building GTIN-to-FDC ID database at: %s", db_path)
+            row_count = _build_gtin_db(db_path)
+            log.info("[Backend Init] ✅ Stored %s GTIN-to-FDC ID mappings.", row_count)
+        # check_same_thread=False: the connection is shared by request threads, guarded by _gtin_db_lock
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    except Exception as e:
+        log.warning("[Backend Init] ⚠️ Could not use GTIN-to-FDC ID database '%s': %s", db_path, e)
+        return None
+
+def lookup_fdc_id(gtin):
+    """Returns the FDC ID mapped to a GTIN, or None if it isn't in the local GTIN-to-FDC ID map."""
+    if _gtin_db is None:
+        return GTIN_TO_FDCID_MAP.get(gtin)
+    with _gtin_db_lock:
+        row = _gtin_db.execute("SELECT fdc_id FROM gtin WHERE gtin = ?", (gtin,)).fetchone()
+    return row[0] if row else None
+
+def load_data_lookups():
+    """
+    Loads all necessary lookup data (additives, common ingredients, GTIN-FDCID map)
+    from JSON files and builds the optimized lookup dictionaries/sets.
+    This function should be called once at application startup.
+    """
+    global GTIN_TO_FDCID_MAP, _gtin_db
+
+    # The ingredient lookups are derived only from the two data files, so reuse a prebuilt
+    # copy when one exists for the current file contents.
+    lookup_cache_path = _lookup_cache_path()
+    if not _load_lookup_cache(lookup_cache_path):
+        _build_ingredient_lookups()
+        _save_lookup_cache(lookup_cache_path)
+
+    # The GTIN-to-FDC ID map is read from a sqlite copy; the JSON is only loaded into
+    # memory if that can't be built (e.g. a read-only filesystem)
+    _gtin_db = _open_gtin_db()
+    if _gtin_db is not None:
+        return
+
+    log.info("[Backend Init] Attempting to load GTIN-to-FDC ID map from: %s", GTIN_FDCID_MAP_FILE)
+    try:
+        with open(GTIN_FDCID_MAP_FILE, 'rb') as f:
+            GTIN_TO_FDCID_MAP = orjson.loads(f.read())
+        log.info("[Backend Init] ✅ Loaded %s GTIN-to-FDC ID mappings.", len(GTIN_TO_FDCID_MAP))
     except FileNotFoundError:
-        print(f"[Backend Init] ❌ Error: GTIN-FDC ID map file not found at '{GTIN_FDCID_MAP_FILE}'. GTIN lookup by FDC ID will not work.")
-    except json.JSONDecodeError as e:
-        print(f"[Backend Init] ❌ Error decoding JSON from '{GTIN_FDCID_MAP_FILE}': {e}")
+        log.error("[Backend Init] ❌ Error: GTIN-FDC ID map file not found at '%s'. GTIN lookup by FDC ID will not work.", GTIN_FDCID_MAP_FILE)
+    except orjson.JSONDecodeError as e:
+        log.error("[Backend Init] ❌ Error decoding JSON from '%s': %s", GTIN_FDCID_MAP_FILE, e)
     except Exception as e:
-        print(f"[Backend Init] ❌ An unexpected error occurred while loading GTIN-FDC ID map: {e}")
+        log.error("[Backend Init] ❌ An unexpected error occurred while loading GTIN-FDC ID map: %s", e)
 
 
 # Call load_data_lookups() immediately when the script is imported/run
@@ -384,62 +692,121 @@ def calculate_nova_score(identified_fda_non_common, identified_fda_common, ident
 
 
 # --- Ingredient Analysis Function (Revised for Data Score and Phrase Matching) ---
+_NO_INGREDIENTS_PLACEHOLDERS = frozenset(('', 'n/a', 'none'))
+
+@lru_cache(maxsize=65536)
+def _normalize_component(component):
+    """
+    Normalizes one ingredient component for lookup: lowercase, collapsed whitespace,
+    'no.' -> 'no ', and trailing punctuation trimmed. Cached, since the same components
+    recur across products and repeat lookups.
+    """
+    normalized = ' '.join(component.lower().split())
+    normalized = normalized.replace('no.', 'no ')
+    return normalized.rstrip('.,\'"').strip()
+
+def _split_parentheticals(text):
+    """
+    Splits out parentheticals (allowing one level of nesting) in a single left-to-right scan.
+    Returns (text with the parentheticals removed, list of their contents).
+    A '(' whose group is unclosed or nested deeper is skipped, and the scan retries from the
+    next '(', so the result is the same as findall()/sub() with
+    r'\(([^()]*?(?:\([^()]*?\)[^()]*?)*?)\)', without scanning the string twice.
+    """
+    if '(' not in text:
+        return text, []
+
+    parens = [(m.start(), m.group()) for m in _PAREN_CHAR_RE.finditer(text)]
+    contents = []
+    main_parts = []
+    copied_up_to = 0 # End of the text already copied to main_parts
+    k = 0
+    while k < len(parens):
+        start, char = parens[k]
+        k += 1
+        if char != '(':
+            continue
+        depth = 1
+        for end_k in range(k, len(parens)):
+            pos, char = parens[end_k]
+            if char == '(':
+                if depth == 2:
+                    break # Nested too deep; retry from the next '('
+                depth = 2
+            elif depth == 2:
+                depth = 1
+            else:
+                contents.append(text[start + 1:pos])
+                main_parts.append(text[copied_up_to:start])
+                copied_up_to = pos + 1
+                k = end_k + 1
+                break
+    main_parts.append(text[copied_up_to:])
+    return ''.join(main_parts), contents
+
 def analyze_ingredients(ingredients_string):
     """
     Analyzes an ingredient string to identify FDA-regulated substances and common ingredients.
     Calculates a Data Score based on the completeness of identification.
     Returns categorized lists of ingredients for the four categories, plus estimated NOVA score.
     """
-    print(f"[Analyze] Starting analysis for ingredients string: {ingredients_string[:100]}...")
+    log.debug("[Analyze] Starting analysis for ingredients string: %.100s...", ingredients_string)
 
     identified_fda_non_common = [] # Changed to list to store dictionaries
     identified_fda_common = []     # Changed to list to store dictionaries
-    identified_common_ingredients_only = set()
-    truly_unidentified_ingredients = set()
-
-    if not ingredients_string:
+    # Insertion-ordered dicts dedupe like sets but keep ingredient-list order, so the
+    # returned lists (and the JSON cached in Airtable) are stable across runs
+    identified_common_ingredients_only = {}
+    truly_unidentified_ingredients = {}
+
+    # Blank or placeholder strings (USDA records without ingredients come through as "N/A")
+    # skip the regex pipeline entirely
+    if not ingredients_string or ingredients_string.strip().lower() in _NO_INGREDIENTS_PLACEHOLDERS:
         nova_score, nova_description = calculate_nova_score([], [], [], [])
-        print(f"[Analyze] No ingredients string. Returning default. NOVA: {nova_score}")
+        log.debug("[Analyze] No ingredients string. Returning default. NOVA: %s", nova_score)
         return [], [], [], [], 100.0, "High", nova_score, nova_description
 
     # Step 1: Initial cleanup and pre-processing
-    cleaned_string = re.sub(r'^(?:ingredients|contains|ingredient list|ingredients list):?\s*', '', ingredients_string, flags=re.IGNORECASE).strip()
-    cleaned_string = re.sub(r'\s+and/or\s+', ', ', cleaned_string, flags=re.IGNORECASE)
-    cleaned_string = re.sub(r'\s*\((?:color|flavour|flavor|emulsifier|stabilizer|thickener|preservative|antioxidant|acidifier|sweetener|gelling agent|firming agent|nutrient|vitamin [a-z0-9]+)\)\s*', '', cleaned_string, flags=re.IGNORECASE)
-    cleaned_string = re.sub(r'\s*\[vitamin b\d\]\s*', '', cleaned_string, flags=re.IGNORECASE)
-    print(f"[Analyze] Cleaned string: {cleaned_string[:100]}...")
+    # The substitutions below start with optional/repeated whitespace, so re has to try a match at
+    # every position; each one is skipped when a character its match requires isn't in the string.
+    cleaned_string = _INGREDIENTS_PREFIX_RE.sub('', ingredients_string).strip()
+    if '/' in cleaned_string:
+        cleaned_string = _AND_OR_RE.sub(', ', cleaned_string)
+    if '(' in cleaned_string:
+        cleaned_string = _ROLE_PARENTHETICAL_RE.sub('', cleaned_string)
+    if '[' in cleaned_string:
+        cleaned_string = _VITAMIN_B_BRACKET_RE.sub('', cleaned_string)
+    log.debug("[Analyze] Cleaned string: %.100s...", cleaned_string)
 
 
     # Step 2: Extract content within parentheses and process separately
-    parenthetical_matches = re.findall(r'\(([^()]*?(?:\([^()]*?\)[^()]*?)*?)\)', cleaned_string)
-    main_components_string = re.sub(r'\([^()]*?(?:\([^()]*?\)[^()]*?)*?\)', '', cleaned_string).strip()
+    main_components_string, parenthetical_matches = _split_parentheticals(cleaned_string)
+    main_components_string = main_components_string.strip()
 
     # Step 3: Split main string into components by commas and semicolons
-    components = [comp.strip() for comp in re.split(r',\s*|;\s*', main_components_string) if comp.strip()]
-
-    for p_content in parenthetical_matches:
-        sub_components = [s.strip() for s in re.split(r',\s*| and\s*', p_content) if s.strip()]
-        components.extend(sub_components)
+    components = [comp.strip() for comp in _COMPONENT_SPLIT_RE.split(main_components_string) if comp.strip()]
 
-    components = [comp for comp in components if comp]
-    print(f"[Analyze] Extracted components: {components}")
+    # All parenthetical contents are joined and sub-split in one pass; the ', ' separator
+    # is itself a split point, so this matches splitting each group separately.
+    if parenthetical_matches:
+        sub_components = _SUB_COMPONENT_SPLIT_RE.split(', '.join(parenthetical_matches))
+        components.extend([s.strip() for s in sub_components if s.strip()])
+    log.debug("[Analyze] Extracted components: %s", components)
 
     total_analyzed_items = len(components)
     categorized_items_count = 0
 
     # Create a quick lookup for additive details by canonical name
     # This map is now populated directly in load_data_lookups from FDA_SUBSTANCE_DETAILS
-    print(f"[Analyze] Using FDA_SUBSTANCE_DETAILS map with {len(FDA_SUBSTANCE_DETAILS)} entries.")
+    log.debug("[Analyze] Using FDA_SUBSTANCE_DETAILS map with %s entries.", len(FDA_SUBSTANCE_DETAILS))
 
 
     for original_component in components:
-        normalized_component = original_component.lower().strip()
-        normalized_component = re.sub(r'\s+', ' ', normalized_component)
-        normalized_component = normalized_component.replace('no.', 'no ')
-        normalized_component = normalized_component.rstrip('.,\'"').strip()
+        normalized_component = _normalize_component(original_component)
 
         if not normalized_component:
             continue
+        words = normalized_component.split()
 
         component_categorized = False
 
@@ -450,66 +817,49 @@ def analyze_ingredients(ingredients_string):
         # We need to find the canonical name from ADDITIVES_LOOKUP for the full component or a phrase within it.
         # This logic is slightly complex as it needs to link a phrase match to a canonical name and then to FDA_SUBSTANCE_DETAILS.
 
-        # First, try direct match or longest phrase match from ADDITIVES_LOOKUP
-        words = normalized_component.split()
-        for i in range(len(words)):
-            for j in range(len(words), i, -1):
-                phrase = " ".join(words[i:j])
-                if phrase in ADDITIVES_LOOKUP:
-                    matched_additive_canonical = ADDITIVES_LOOKUP[phrase]
-                    break
-            if matched_additive_canonical:
-                break
+        # First, try direct match or longest phrase match from ADDITIVES_LOOKUP.
+        # The same walk also finds the Pass 2 common ingredient match, used only if no additive matched.
+        matched_additive_canonical, matched_common_ingredient_original_casing = _match_phrases(words)
         
         if matched_additive_canonical:
             # Retrieve full details from FDA_SUBSTANCE_DETAILS
-            substance_details = FDA_SUBSTANCE_DETAILS.get(matched_additive_canonical, {})
+            substance_details = FDA_SUBSTANCE_DETAILS.get(matched_additive_canonical)
+            if substance_details is None:
+                substance_details = FdaSubstanceDetails(matched_additive_canonical, "N/A", (), (), (), (), "N/A")
             
             ingredient_obj = {
                 "name": original_component, # Keep original casing from ingredient list
-                "canonical_name": substance_details.get("original_name", matched_additive_canonical),
-                "used_for_raw": substance_details.get("used_for_raw", "N/A"),
-                "used_for_categories": substance_details.get("used_for_categories", []),
-                "used_for_colors": substance_details.get("used_for_colors", []),
-                "individual_technical_effects": substance_details.get("individual_technical_effects", []), # Use pre-analyzed individual effects
-                "other_names": substance_details.get("other_names", []),
-                "cas_no": substance_details.get("cas_no", "N/A")
+                "canonical_name": substance_details.original_name,
+                "used_for_raw": substance_details.used_for_raw,
+                "used_for_categories": substance_details.used_for_categories,
+                "used_for_colors": substance_details.used_for_colors,
+                "individual_technical_effects": substance_details.individual_technical_effects, # Use pre-analyzed individual effects
+                "other_names": substance_details.other_names,
+                "cas_no": substance_details.cas_no
             }
 
             if matched_additive_canonical in COMMON_FDA_SUBSTANCES_SET:
                 identified_fda_common.append(ingredient_obj)
-                print(f"[Analyze] Identified FDA Common: {original_component} (Categories: {ingredient_obj['used_for_categories']})")
+                log.debug("[Analyze] Identified FDA Common: %s (Categories: %s)", original_component, substance_details.used_for_categories)
             else:
                 identified_fda_non_common.append(ingredient_obj)
-                print(f"[Analyze] Identified FDA Non-Common: {original_component} (Categories: {ingredient_obj['used_for_categories']})")
+                log.debug("[Analyze] Identified FDA Non-Common: %s (Categories: %s)", original_component, substance_details.used_for_categories)
             component_categorized = True
         else:
-            # Pass 2: If not an FDA Additive, try to match against Common Ingredients (longest match first)
-            matched_common_ingredient_original_casing = None
-            words = normalized_component.split()
-            for i in range(len(words)):
-                for j in range(len(words), i, -1):
-                    phrase = " ".join(words[i:j])
-                    if phrase in COMMON_INGREDIENTS_LOOKUP:
-                        # Ensure it's not an FDA substance that we already caught in Pass 1
-                        if phrase not in ADDITIVES_LOOKUP or ADDITIVES_LOOKUP[phrase] not in COMMON_FDA_SUBSTANCES_SET:
-                            matched_common_ingredient_original_casing = COMMON_INGREDIENTS_LOOKUP[phrase]
-                            break
-                if matched_common_ingredient_original_casing:
-                    break
-
+            # Pass 2: If not an FDA Additive, use the Common Ingredients match (longest match first).
+            # No need to re-check it against ADDITIVES_LOOKUP: no phrase in this component is an FDA substance.
             if matched_common_ingredient_original_casing:
-                identified_common_ingredients_only.add(matched_common_ingredient_original_casing)
-                print(f"[Analyze] Identified Common Only: {original_component}")
+                identified_common_ingredients_only[matched_common_ingredient_original_casing] = None
+                log.debug("[Analyze] Identified Common Only: %s", original_component)
                 component_categorized = True
             else:
-                truly_unidentified_ingredients.add(original_component)
-                print(f"[Analyze] Identified Unidentified: {original_component}")
+                truly_unidentified_ingredients[original_component] = None
+                log.debug("[Analyze] Identified Unidentified: %s", original_component)
 
         if component_categorized:
             categorized_items_count += 1
 
-    # Convert sets to lists for consistent return type
+    # Convert the dicts' keys to lists for consistent return type
     identified_common_ingredients_only_list = list(identified_common_ingredients_only)
     truly_unidentified_ingredients_list = list(truly_unidentified_ingredients)
 
@@ -535,70 +885,254 @@ def analyze_ingredients(ingredients_string):
         identified_common_ingredients_only_list, # Corrected
         truly_unidentified_ingredients_list      # Corrected
     )
-    print(f"[Analyze] Analysis complete. Data Score: {data_score_percentage}%, NOVA: {nova_score}")
-    print(f"[Analyze] FDA Non-Common ({len(identified_fda_non_common)}): {identified_fda_non_common}")
-    print(f"[Analyze] FDA Common ({len(identified_fda_common)}): {identified_fda_common}")
+    log.debug("[Analyze] Analysis complete. Data Score: %s%%, NOVA: %s", data_score_percentage, nova_score)
+    log.debug("[Analyze] FDA Non-Common (%s): %s", len(identified_fda_non_common), identified_fda_non_common)
+    log.debug("[Analyze] FDA Common (%s): %s", len(identified_fda_common), identified_fda_common)
 
 
     return (identified_fda_non_common, identified_fda_common,
             identified_common_ingredients_only_list, truly_unidentified_ingredients_list,
             data_score_percentage, data_completeness_level, nova_score, nova_description)
 
+_now_cache = (0, '')  # (epoch second, its ISO string) last formatted by _now_epoch_and_iso
+
+def _now_epoch_and_iso():
+    """
+    Returns the current time as (epoch seconds, local ISO string) for last_access fields.
+    last_access only needs second resolution, so the string is formatted once per second
+    and reused by every write in that second.
+    """
+    global _now_cache
+    now_epoch = int(time.time())
+    cached = _now_cache
+    if cached[0] != now_epoch:
+        cached = (now_epoch, datetime.fromtimestamp(now_epoch).isoformat())
+        _now_cache = cached  # Swapped as one tuple, so readers never see a mismatched pair
+    return cached
+
+def queue_lookup_count_update(record_id, current_lookup_count):
+    """
+    Buffers a lookup_count/last_access update for an Airtable record and schedules a flush.
+    Hits that arrive before the flush build on the pending count, so no increments are lost.
+    Returns the new lookup_count.
+    """
+    global _flush_timer
+    with _pending_updates_lock:
+        pending_fields = _pending_updates.get(record_id, {})
+        new_lookup_count = max(current_lookup_count, pending_fields.get('lookup_count', 0)) + 1
+        now_epoch, now_iso = _now_epoch_and_iso()
+        _pending_updates[record_id] = {
+            'lookup_count': new_lookup_count,
+            'last_access': now_iso,
+            'last_access_epoch': now_epoch,
+            'utility_score': _utility_score(new_lookup_count, now_epoch)
+        }
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(AIRTABLE_FLUSH_INTERVAL_SECONDS, flush_pending_updates)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    _index_record(record_id, new_lookup_count, now_epoch)
+    return new_lookup_count
+
+# Columns used by the eviction index, added after the cache table was first set up. Bases
+# without them reject any write that names them (422 UNKNOWN_FIELD_NAME); the first such
+# error turns them off for the rest of the process, and the index falls back to last_access.
+EVICTION_FIELDS = ('last_access_epoch', 'utility_score')
+_eviction_fields_supported = True
+
+def _is_unknown_field_error(e):
+    """True for Airtable's 422 UNKNOWN_FIELD_NAME, raised by the wrapper as an HTTPError."""
+    response = getattr(e, 'response', None)
+    return (isinstance(e, requests.exceptions.HTTPError) and response is not None
+            and response.status_code == 422 and 'UNKNOWN_FIELD_NAME' in str(e.args))
+
+def _disable_eviction_fields():
+    """Stops reading and writing EVICTION_FIELDS after Airtable rejected them."""
+    global _eviction_fields_supported
+    _eviction_fields_supported = False
+    log.warning("[Backend] ⚠️ Airtable table has no %s column(s); working without them. "
+                "Add them as Number fields to persist eviction scores.", ", ".join(EVICTION_FIELDS))
+
+def _without_eviction_fields(fields):
+    """Returns a copy of record fields without the EVICTION_FIELDS columns."""
+    return {key: value for key, value in fields.items() if key not in EVICTION_FIELDS}
+
+def _write_with_eviction_fields(write, records, strip):
+    """
+    Calls write(records), e.g. airtable.batch_insert. If the base doesn't have the
+    EVICTION_FIELDS columns, retries once with strip applied to each record, and strips
+    them from every later write. Returns what write returns.
+    """
+    if not _eviction_fields_supported:
+        return write([strip(record) for record in records])
+    try:
+        return write(records)
+    except Exception as e:
+        if not _is_unknown_field_error(e):
+            raise
+        _disable_eviction_fields()
+        return write([strip(record) for record in records])
+
+def flush_pending_updates():
+    """
+    Writes all buffered usage-stat updates to Airtable.
+    batch_update sends the records in chunks of 10 per request.
+    """
+    global _flush_timer
+    with _pending_updates_lock:
+        records = [{'id': record_id, 'fields': fields} for record_id, fields in _pending_updates.items()]
+        _pending_updates.clear()
+        _flush_timer = None
+
+    if not records or not airtable:
+        return
+
+    try:
+        _write_with_eviction_fields(
+            airtable.batch_update, records,
+            lambda record: {'id': record['id'], 'fields': _without_eviction_fields(record['fields'])})
+        log.info("[Backend] ✅ Flushed %s buffered lookup_count update(s) to Airtable.", len(records))
+    except Exception as e:
+        log.warning("[Backend] ⚠️ Error flushing buffered lookup_count updates: %s", e)
+
+def _gtin_lru_get(gtin):
+    """Returns (record_id, fields) for a GTIN from the in-process cache, or None if missing or expired."""
+    with _gtin_lru_lock:
+        entry = _GTIN_LRU.get(gtin)
+        if entry is None:
+            return None
+        record_id, fields, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _GTIN_LRU[gtin]
+            return None
+        _GTIN_LRU.move_to_end(gtin)
+        return record_id, fields
+
+def _gtin_lru_put(gtin, record_id, fields):
+    """Adds decoded cache fields for a GTIN to the in-process cache, evicting the least recently used."""
+    with _gtin_lru_lock:
+        _GTIN_LRU[gtin] = (record_id, fields, time.monotonic() + GTIN_LRU_TTL_SECONDS)
+        _GTIN_LRU.move_to_end(gtin)
+        while len(_GTIN_LRU) > GTIN_LRU_MAX_ENTRIES:
+            _GTIN_LRU.popitem(last=False)
+
+def _gtin_lru_discard_record(record_id):
+    """Drops an Airtable record from the in-process cache, e.g. after it was evicted from Airtable."""
+    with _gtin_lru_lock:
+        for gtin, (cached_record_id, _, _) in list(_GTIN_LRU.items()):
+            if cached_record_id == record_id:
+                del _GTIN_LRU[gtin]
+
+# Cache fields stored in Airtable as JSON strings of ingredient lists
+_JSON_FIELDS = ('identified_fda_non_common', 'identified_fda_common',
+                'identified_common_ingredients_only', 'truly_unidentified_ingredients')
+# Lists whose JSON is at least this many bytes are stored gzipped and base64 encoded,
+# behind the prefix below. Shorter ones stay plain JSON, where gzip wouldn't save anything.
+PACKED_FIELD_MIN_BYTES = 256
+PACKED_FIELD_PREFIX = 'gz:'
+
+def _pack_json_field(value):
+    """Encodes an ingredient list for an Airtable cell: plain JSON, or 'gz:' + base64(gzip(JSON)) if large."""
+    data = orjson.dumps(value)
+    if len(data) >= PACKED_FIELD_MIN_BYTES:
+        # mtime=0 keeps the output identical for identical lists
+        packed = PACKED_FIELD_PREFIX + base64.b64encode(gzip.compress(data, mtime=0)).decode()
+        if len(packed) < len(data):
+            return packed
+    return data.decode() # orjson returns bytes; Airtable wants str
+
+def _unpack_json_field(field_data):
+    """Decodes a cell written by _pack_json_field; rows stored before packing are plain JSON."""
+    if field_data.startswith(PACKED_FIELD_PREFIX):
+        try:
+            field_data = gzip.decompress(base64.b64decode(field_data[len(PACKED_FIELD_PREFIX):]))
+        except (binascii.Error, OSError, EOFError, zlib.error) as e:
+            raise orjson.JSONDecodeError(f"Invalid packed field: {e}", str(field_data), 0) from e
+    return orjson.loads(field_data)
+
+def _decode_cached_fields(fields):
+    """
+    Converts Airtable cache fields back into Python objects in place: the JSON string
+    ingredient lists are loaded and nova_score is made an int where possible.
+    Returns fields.
+    """
+    # Ensure JSON strings are loaded back into Python objects.
+    for key in _JSON_FIELDS:
+        try:
+            field_data = fields[key]
+        except KeyError:
+            continue
+        # Exact type checks: Airtable only returns plain str (or list from the in-process cache)
+        if type(field_data) is str:
+            try:
+                fields[key] = _unpack_json_field(field_data)
+            except orjson.JSONDecodeError:
+                log.warning("[Backend] ⚠️ Error decoding JSON for field '%s' from cache. Setting to empty list.", key)
+                fields[key] = [] # Default to empty list on error
+        elif type(field_data) is not list:
+            # If it's not a string and not already a list, default to empty list
+            log.warning("[Backend] ⚠️ Unexpected type for field '%s' in cache (%s). Setting to empty list.", key, type(field_data).__name__)
+            fields[key] = []
+
+    # Ensure nova_score is an int/float if it was stored as string
+    if 'nova_score' in fields and isinstance(fields['nova_score'], str):
+        try:
+            fields['nova_score'] = int(fields['nova_score'])
+        except ValueError:
+            pass # Keep as string if not convertible to int
+
+    return fields
+
+def check_gtin_lru(gtin):
+    """
+    Checks the in-process cache for a GTIN. On a hit, queues the lookup_count/last_access
+    update and returns the decoded fields; otherwise returns None. Cheap enough to call
+    on the request thread before any Airtable or USDA work is started.
+    """
+    cached = _gtin_lru_get(gtin)
+    if cached is None:
+        return None
+    record_id, fields = cached
+    # Keep the cached count current so later hits build on it
+    fields['lookup_count'] = queue_lookup_count_update(record_id, fields.get('lookup_count', 0))
+    log.info("[Backend] ✅ In-process cache hit. Queued lookup_count update: %s", fields['lookup_count'])
+    return fields
+
 def check_airtable_cache(gtin):
     """
-    Checks if a GTIN exists in the Airtable cache.
+    Checks if a GTIN exists in the Airtable cache (callers check check_gtin_lru first).
     If found, updates lookup count and last access timestamp.
-    Returns the raw fields from Airtable if found, otherwise None.
+    Returns the decoded fields from Airtable if found, otherwise None.
+    Airtable errors are logged and re-raised: the caller can't tell whether the GTIN is
+    cached, so it mustn't insert it again.
     """
     if not airtable:
-        print("[Backend] Airtable not initialized. Skipping cache check.")
+        log.info("[Backend] Airtable not initialized. Skipping cache check.")
         return None
 
-    print(f"[Backend] Checking Airtable cache for GTIN: {gtin}")
+    log.info("[Backend] Checking Airtable cache for GTIN: %s", gtin)
     try:
-        records = airtable.search('gtin_upc', gtin)
-        if records:
-            record = records[0]
+        # match() sends {gtin_upc}='<gtin>' as filterByFormula, so Airtable does the lookup;
+        # max_records=1 stops it at the first row. gtin is digits only (checked by _GTIN_RE).
+        record = airtable.match('gtin_upc', gtin, max_records=1)
+        if record:
             record_id = record['id']
             fields = record['fields']
 
-            # Update usage stats: increment lookup_count and update last_access
-            updated_fields = {
-                'lookup_count': fields.get('lookup_count', 0) + 1,
-                'last_access': datetime.now().isoformat()
-            }
-            airtable.update(record_id, updated_fields)
-            print(f"[Backend] ✅ Cache hit. Updated lookup_count: {updated_fields['lookup_count']}")
+            # Update usage stats: increment lookup_count and update last_access.
+            # The write is buffered and sent in a batch by flush_pending_updates().
+            fields['lookup_count'] = queue_lookup_count_update(record_id, fields.get('lookup_count', 0))
+            log.info("[Backend] ✅ Cache hit. Queued lookup_count update: %s", fields['lookup_count'])
 
             # Return the full fields, which now include the individual ingredient lists, NOVA, etc.
-            # Ensure JSON strings are loaded back into Python objects.
-            for key in ['identified_fda_non_common', 'identified_fda_common', 
-                         'identified_common_ingredients_only', 'truly_unidentified_ingredients']:
-                if key in fields:
-                    field_data = fields[key]
-                    if isinstance(field_data, str):
-                        try:
-                            fields[key] = json.loads(field_data)
-                        except json.JSONDecodeError:
-                            print(f"[Backend] ⚠️ Error decoding JSON for field '{key}' from cache. Setting to empty list.")
-                            fields[key] = [] # Default to empty list on error
-                    elif not isinstance(field_data, list):
-                        # If it's not a string and not already a list, default to empty list
-                        print(f"[Backend] ⚠️ Unexpected type for field '{key}' in cache ({type(field_data).__name__}). Setting to empty list.")
-                        fields[key] = []
-            
-            # Ensure nova_score is an int/float if it was stored as string
-            if 'nova_score' in fields and isinstance(fields['nova_score'], str):
-                try:
-                    fields['nova_score'] = int(fields['nova_score'])
-                except ValueError:
-                    pass # Keep as string if not convertible to int
-
+            _decode_cached_fields(fields)
+            _gtin_lru_put(gtin, record_id, fields)
             return fields
         else:
-            print("[Backend] Cache miss.")
+            log.info("[Backend] Cache miss.")
     except Exception as e:
-        print(f"[Backend] ⚠️ Airtable lookup error: {e}")
+        log.warning("[Backend] ⚠️ Airtable lookup error: %s", e)
+        raise
     return None
 
 def fetch_from_usda_api(gtin):
@@ -608,50 +1142,96 @@ def fetch_from_usda_api(gtin):
     This replaces the unreliable direct GTIN search on USDA API.
     """
     if not USDA_API_KEY:
-        print("[Render Backend] USDA API Key not set. Cannot fetch from USDA API.")
+        log.warning("[Render Backend] USDA API Key not set. Cannot fetch from USDA API.")
         return None
 
-    # Step 1: Look up FDC ID in the local GTIN_TO_FDCID_MAP
-    fdc_id = GTIN_TO_FDCID_MAP.get(gtin)
+    # Step 1: Look up FDC ID in the local GTIN-to-FDC ID map
+    fdc_id = lookup_fdc_id(gtin)
 
     if not fdc_id:
-        print(f"[Render Backend] ❌ GTIN '{gtin}' not found in local GTIN-FDC ID map. Cannot proceed with FDC ID lookup.")
+        log.error("[Render Backend] ❌ GTIN '%s' not found in local GTIN-FDC ID map. Cannot proceed with FDC ID lookup.", gtin)
         return None
 
-    print(f"[Render Backend] ✅ GTIN '{gtin}' mapped to FDC ID: '{fdc_id}' locally. Querying USDA API by FDC ID...")
+    log.info("[Render Backend] ✅ GTIN '%s' mapped to FDC ID: '%s' locally. Querying USDA API by FDC ID...", gtin, fdc_id)
 
     # Step 2: Fetch product details from USDA API using the FDC ID
-    api_url = f"{USDA_GET_FOOD_BY_FDCID_URL}{fdc_id}?api_key={USDA_API_KEY}"
-    
+    api_url = f"{USDA_GET_FOOD_BY_FDCID_URL}{fdc_id}"
+    # Only description, ingredients and brand fields are used downstream. The nutrients filter
+    # trims the foodNutrients array, which is most of a full Branded food record.
+    params = {"api_key": USDA_API_KEY, "nutrients": USDA_NUTRIENTS_FILTER}
+
     try:
-        response = requests.get(api_url, timeout=10)
+        response = _usda_session.get(api_url, params=params, timeout=(2, 10)) # (connect, read)
         response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        data = response.json()
+        data = orjson.loads(response.content) # Parse the raw bytes; skips requests' text decoding and stdlib json
 
-        print(f"[Render Backend] ✅ Successfully fetched data for FDC ID '{fdc_id}'.")
+        log.info("[Render Backend] ✅ Successfully fetched data for FDC ID '%s'.", fdc_id)
         return data
     except requests.exceptions.RequestException as e:
-        print(f"[Render Backend] ❌ Error fetching from USDA API for FDC ID '{fdc_id}': {e}")
-        traceback.print_exc()
-    except json.JSONDecodeError as e:
-        print(f"[Render Backend] ❌ JSON Decode Error from USDA API for FDC ID '{fdc_id}'. Response: {response.text.strip()}")
-        traceback.print_exc()
+        log.exception("[Render Backend] ❌ Error fetching from USDA API for FDC ID '%s': %s", fdc_id, e)
+    except orjson.JSONDecodeError as e:
+        log.exception("[Render Backend] ❌ JSON Decode Error from USDA API for FDC ID '%s'. Response: %s", fdc_id, response.text.strip())
     except Exception as e:
-        print(f"[Render Backend] ❌ An unexpected error occurred: {e}")
-        traceback.print_exc()
+        log.exception("[Render Backend] ❌ An unexpected error occurred: %s", e)
         
     return None
 
+def _fetch_from_usda_single_flight(gtin):
+    """
+    Returns (future, is_leader) for the USDA fetch of a GTIN. Only the first caller
+    (the leader) submits the fetch; concurrent callers for the same GTIN (followers) get
+    the same future and are counted. The entry is dropped as soon as the fetch completes,
+    so later requests go through the cache as usual.
+    """
+    with _INFLIGHT_LOCK:
+        entry = _INFLIGHT.get(gtin)
+        if entry is not None:
+            log.info("[Render Backend] Joining in-flight USDA fetch for GTIN %s.", gtin)
+            entry[1] += 1
+            return entry[0], False
+        future = _usda_pool.submit(fetch_from_usda_api, gtin)
+        _INFLIGHT[gtin] = [future, 0]
+    future.add_done_callback(lambda f: _discard_inflight(gtin, f))
+    return future, True
+
+def _release_usda_fetch(gtin, future, is_leader):
+    """
+    Called when a request no longer needs its USDA fetch (the GTIN was found in Airtable).
+    A follower just stops counting. The leader drops the in-flight entry and cancels the
+    fetch if no followers are waiting on it; a fetch that's already running finishes, but
+    nobody waits for it.
+    """
+    with _INFLIGHT_LOCK:
+        entry = _INFLIGHT.get(gtin)
+        if entry is None or entry[0] is not future:
+            return # Already finished, or dropped by its leader
+        if not is_leader:
+            entry[1] -= 1
+            return
+        if entry[1] > 0:
+            return # Followers still need the result
+        del _INFLIGHT[gtin]
+    if future.cancel():
+        log.info("[Render Backend] Cancelled speculative USDA fetch for cached GTIN %s.", gtin)
+
+def _discard_inflight(gtin, future):
+    """Removes a finished USDA fetch from the single-flight map, unless it was already replaced."""
+    with _INFLIGHT_LOCK:
+        entry = _INFLIGHT.get(gtin)
+        if entry is not None and entry[0] is future:
+            del _INFLIGHT[gtin]
+
 def store_to_airtable(gtin, usda_data, analyzed_data):
     """
     Stores product data pulled from USDA API (and analysis results) into the Airtable cache.
     analyzed_data is a dictionary containing all structured analysis results.
+    The record is buffered and written by flush_pending_inserts.
     """
     if not airtable:
-        print("[Render Backend] Airtable client not initialized. Skipping store to Airtable.")
+        log.info("[Render Backend] Airtable client not initialized. Skipping store to Airtable.")
         return
 
-    print(f"[Render Backend] Attempting to store GTIN {gtin} to Airtable...")
+    log.info("[Render Backend] Attempting to store GTIN %s to Airtable...", gtin)
 
     # Extracting data from usda_data
     product_description = usda_data.get("description", "")
@@ -668,6 +1248,7 @@ def store_to_airtable(gtin, usda_data, analyzed_data):
     nova_score = analyzed_data.get("nova_score", "N/A")
     nova_description = analyzed_data.get("nova_description", "N/A")
 
+    now_epoch, now_iso = _now_epoch_and_iso()
     fields = {
         "gtin_upc": gtin,
         "fdc_id": str(usda_data.get("fdcId", "")),
@@ -676,102 +1257,309 @@ def store_to_airtable(gtin, usda_data, analyzed_data):
         "description": product_description,
         "ingredients": product_ingredients,
         "lookup_count": 1, # Initialize lookup_count to 1 on first insertion
-        "last_access": datetime.now().isoformat(),
+        "last_access": now_iso,
+        "last_access_epoch": now_epoch, # Integer copy of last_access used for eviction
+        "utility_score": _utility_score(1, now_epoch),
         "source": "USDA API",
-        # Store structured data points as JSON strings
-        "identified_fda_non_common": json.dumps(identified_fda_non_common), 
-        "identified_fda_common": json.dumps(identified_fda_common),
-        "identified_common_ingredients_only": json.dumps(identified_common_ingredients_only),
-        "truly_unidentified_ingredients": json.dumps(truly_unidentified_ingredients),
+        # Store structured data points as JSON strings, gzipped when large (see _pack_json_field)
+        "identified_fda_non_common": _pack_json_field(identified_fda_non_common),
+        "identified_fda_common": _pack_json_field(identified_fda_common),
+        "identified_common_ingredients_only": _pack_json_field(identified_common_ingredients_only),
+        "truly_unidentified_ingredients": _pack_json_field(truly_unidentified_ingredients),
         "data_score": data_score,
         "data_completeness_level": data_completeness_level,
         "nova_score": str(nova_score), # Store as string to handle "N/A" and numbers
         "nova_description": nova_description
     }
+    # Same record with the Python lists for the in-process cache, so the JSON just encoded
+    # isn't parsed again once the insert is written (see _decode_cached_fields)
+    cached_fields = dict(
+        fields,
+        identified_fda_non_common=identified_fda_non_common,
+        identified_fda_common=identified_fda_common,
+        identified_common_ingredients_only=identified_common_ingredients_only,
+        truly_unidentified_ingredients=truly_unidentified_ingredients,
+        nova_score=nova_score,
+    )
+
+    queue_insert(gtin, fields, cached_fields)
+
+def queue_insert(gtin, fields, cached_fields):
+    """
+    Buffers a new cache record for a GTIN and schedules a batched insert. cached_fields
+    is the decoded form of fields, added to the in-process cache once the record is written.
+    A later record for the same GTIN replaces the buffered one. Once a full batch
+    (AIRTABLE_BATCH_SIZE records) is buffered it's written right away on the calling
+    thread, which is the background executor, instead of waiting for the timer.
+    """
+    global _insert_flush_timer
+    with _pending_inserts_lock:
+        _pending_inserts[gtin] = (fields, cached_fields)
+        batch_full = len(_pending_inserts) >= AIRTABLE_BATCH_SIZE
+        if batch_full:
+            if _insert_flush_timer is not None:
+                _insert_flush_timer.cancel()
+                _insert_flush_timer = None
+        elif _insert_flush_timer is None:
+            _insert_flush_timer = threading.Timer(AIRTABLE_FLUSH_INTERVAL_SECONDS, flush_pending_inserts)
+            _insert_flush_timer.daemon = True
+            _insert_flush_timer.start()
+    log.info("[Render Backend] Queued GTIN %s for Airtable insert.", gtin)
+    if batch_full:
+        flush_pending_inserts()
+
+def pending_insert_count():
+    """Returns the number of buffered records not yet written to Airtable."""
+    with _pending_inserts_lock:
+        return len(_pending_inserts)
+
+def queue_delete(record_id):
+    """
+    Buffers the deletion of an evicted record. It's sent with batch_delete by the next
+    flush_pending_inserts, which the insert that caused the eviction schedules.
+    """
+    with _pending_inserts_lock:
+        _pending_deletes.append(record_id)
+
+def flush_pending_inserts():
+    """
+    Deletes all buffered evicted records with batch_delete, then writes all buffered new
+    records with batch_insert; both send chunks of 10 per request. The new records are then
+    added to the eviction index and the in-process cache.
+    """
+    global _insert_flush_timer, _row_count
+    with _pending_inserts_lock:
+        pending = list(_pending_inserts.items())
+        _pending_inserts.clear()
+        deletes = _pending_deletes[:]
+        _pending_deletes.clear()
+        _insert_flush_timer = None
+
+    if not airtable:
+        return
+
+    if deletes:
+        try:
+            airtable.batch_delete(deletes)
+            log.info("[Render Backend] 🗑️ Deleted %s evicted record(s) from Airtable.", len(deletes))
+        except Exception as e:
+            # Some chunks may not have been deleted; rebuild the index from Airtable on next use
+            with _eviction_lock:
+                _row_count = None
+            log.exception("[Render Backend] ❌ Failed to delete %s evicted record(s): %s", len(deletes), e)
+
+    if not pending:
+        return
+
+    try:
+        records = _write_with_eviction_fields(
+            airtable.batch_insert, [fields for _, (fields, _) in pending], _without_eviction_fields)
+    except Exception as e:
+        # Some chunks may have been written; rebuild the index from Airtable on next use
+        with _eviction_lock:
+            _row_count = None
+        log.exception("[Render Backend] ❌ Failed to store %s record(s) to Airtable: %s", len(pending), e)
+        return
+
+    for (gtin, (fields, cached_fields)), record in zip(pending, records):
+        _index_record(record['id'], fields['lookup_count'], fields['last_access_epoch'], is_new=True)
+        _gtin_lru_put(gtin, record['id'], cached_fields)
+    log.info("[Render Backend] ✅ Stored %s record(s) to Airtable.", len(records))
+
+def _parse_last_access(last_access_str):
+    """
+    Converts an ISO last_access string into epoch seconds (0 if missing or invalid).
+    Only needed for rows stored before the last_access_epoch column existed.
+    """
+    try:
+        last_access_dt = datetime.fromisoformat(last_access_str.replace('Z', '+00:00')) # Handle 'Z' for UTC
+        return int(last_access_dt.timestamp())
+    except (AttributeError, ValueError, OverflowError):
+        return 0 # Fallback for missing or invalid date string
+
+def _utility_score(lookup_count, last_access_epoch):
+    """
+    Eviction utility of a cached record; the lowest is evicted first.
+    log(lookup_count + 1) plus the last access time in units of the freshness window, which ranks
+    records the same as (lookup_count + 1) * exp(-age / window): a hit count that decays with age.
+    Unlike that product it only changes when the record is accessed, so it can be stored.
+    """
+    return math.log(lookup_count + 1) + last_access_epoch / UTILITY_DECAY_SECONDS
+
+def _warm_eviction_index():
+    """
+    Builds the row count and eviction heap from a single Airtable scan if not already warm,
+    or if the last scan is older than EVICTION_INDEX_RESYNC_SECONDS.
+    Must be called with _eviction_lock held.
+    """
+    global _row_count, _eviction_heap, _eviction_index_synced_at
+    if _row_count is not None and time.monotonic() - _eviction_index_synced_at < EVICTION_INDEX_RESYNC_SECONDS:
+        return
 
+    log.info("[Render Backend] Warming Airtable eviction index...")
+    # last_access is only read for legacy rows that have no last_access_epoch yet
+    fields_to_read = ['lookup_count', 'last_access']
+    if _eviction_fields_supported:
+        fields_to_read += EVICTION_FIELDS
     try:
-        airtable.insert(fields)
-        print(f"[Render Backend] ✅ Stored to Airtable: {fields.get('description', gtin)}")
+        records = airtable.get_all(fields=fields_to_read)
     except Exception as e:
-        print(f"[Render Backend] ❌ Failed to store to Airtable for GTIN {gtin}: {e}")
-        # Print a more detailed traceback for debugging
-        traceback.print_exc()
+        if not _eviction_fields_supported or not _is_unknown_field_error(e):
+            raise
+        # Base without the eviction columns: score every row from last_access instead
+        _disable_eviction_fields()
+        records = airtable.get_all(fields=['lookup_count', 'last_access'])
+    _eviction_entries.clear()
+    for r in records:
+        fields = r["fields"]
+        lookup_count = fields.get("lookup_count", 0)
+        last_access_epoch = fields.get("last_access_epoch")
+        if last_access_epoch is None:
+            last_access_epoch = _parse_last_access(fields.get("last_access"))
+        # Rows stored before utility_score existed get it computed here
+        utility_score = fields.get("utility_score")
+        if utility_score is None:
+            utility_score = _utility_score(lookup_count, last_access_epoch)
+        _eviction_entries[r['id']] = (utility_score, r['id'], lookup_count, last_access_epoch)
+    _eviction_heap = list(_eviction_entries.values())
+    heapq.heapify(_eviction_heap)
+    _row_count = len(records)
+    _eviction_index_synced_at = time.monotonic()
+    log.info("[Render Backend] ✅ Eviction index warmed with %s rows.", _row_count)
+
+def _index_record(record_id, lookup_count, last_access_epoch, is_new=False):
+    """Adds or refreshes a record in the eviction index. No-op until the index is warmed."""
+    global _row_count
+    with _eviction_lock:
+        if _row_count is None:
+            return
+        if is_new and record_id not in _eviction_entries:
+            _row_count += 1
+        entry = (_utility_score(lookup_count, last_access_epoch), record_id, lookup_count, last_access_epoch)
+        _eviction_entries[record_id] = entry
+        heapq.heappush(_eviction_heap, entry)
 
 def count_airtable_rows():
-    """Counts the total number of records in the Airtable table."""
+    """Returns the total number of records in the Airtable table, from the in-memory index."""
     if not airtable:
-        print("[Render Backend] Airtable client not initialized. Skipping row count.")
+        log.info("[Render Backend] Airtable client not initialized. Skipping row count.")
         return 0
 
-    print("[Render Backend] Counting Airtable rows...")
     try:
-        # Corrected: Fetch all records without specifying fields to avoid "id" field issue
-        records = airtable.get_all()
-        return len(records)
+        with _eviction_lock:
+            _warm_eviction_index()
+            return _row_count
     except Exception as e:
-        print(f"[Render Backend] ⚠️ Error counting Airtable rows: {e}")
+        log.warning("[Render Backend] ⚠️ Error counting Airtable rows: %s", e)
         return 0
 
 def delete_least_valuable_row():
     """
-    Deletes the least valuable record in Airtable based on an effective score
-    that combines lookup_count and freshness (last_access).
-    Least valuable = lowest effective score, then oldest last_access for ties.
+    Evicts the least valuable record: the one with the lowest utility_score, which combines
+    lookup_count and freshness (last_access). See _utility_score. It's removed from the index
+    and the in-process cache right away; the Airtable delete is buffered (see queue_delete).
     """
+    global _row_count
     if not airtable:
-        print("[Render Backend] Airtable client not initialized. Skipping row deletion.")
+        log.info("[Render Backend] Airtable client not initialized. Skipping row deletion.")
         return
 
-    print("[Render Backend] Checking for least valuable row to evict using effective score...")
+    log.info("[Render Backend] Checking for least valuable row to evict using utility score...")
     try:
-        # Fetch records with 'lookup_count' and 'last_access' fields
-        records = airtable.get_all(fields=['lookup_count', 'last_access'])
+        with _eviction_lock:
+            _warm_eviction_index()
+
+            least_valuable_entry = None
+            while _eviction_heap:
+                entry = heapq.heappop(_eviction_heap)
+                if _eviction_entries.get(entry[1]) is entry:
+                    least_valuable_entry = entry
+                    break
+                # Otherwise it's a stale entry superseded by a newer one, drop it
 
-        if records:
-            # Calculate effective score for each record
-            records_with_effective_score = []
-            now = datetime.now()
-            for r in records:
-                fields = r["fields"]
-                lookup_count = fields.get("lookup_count", 0)
-                last_access_str = fields.get("last_access", "0000-01-01T00:00:00.000Z")
-                
-                try:
-                    last_access_dt = datetime.fromisoformat(last_access_str.replace('Z', '+00:00')) # Handle 'Z' for UTC
-                except ValueError:
-                    last_access_dt = datetime.min # Fallback for invalid date string
-
-                effective_score = lookup_count
-
-                # Apply freshness bonus if within the freshness window
-                if now - last_access_dt < timedelta(days=FRESHNESS_WINDOW_DAYS):
-                    effective_score += FRESHNESS_BONUS
-                
-                records_with_effective_score.append({
-                    'id': r['id'],
-                    'fields': fields, # Keep original fields for logging
-                    'effective_score': effective_score,
-                    'last_access_dt': last_access_dt # Store datetime object for direct comparison
-                })
-
-            # Sort records: first by effective_score (ascending), then by last_access_dt (ascending for oldest)
-            records_sorted = sorted(records_with_effective_score, key=lambda r: (
-                r["effective_score"],
-                r["last_access_dt"]
-            ))
-
-            least_valuable_record_info = records_sorted[0]
-            record_id_to_delete = least_valuable_record_info['id']
-            
-            airtable.delete(record_id_to_delete)
-            print(f"[Render Backend] 🗑️ Deleted least valuable entry (ID: {record_id_to_delete}, "
-                  f"Lookup Count: {least_valuable_record_info['fields'].get('lookup_count', 0)}, "
-                  f"Last Access: {least_valuable_record_info['fields'].get('last_access', 'N/A')}), "
-                  f"Effective Score: {least_valuable_record_info['effective_score']}).")
-        else:
-            print("[Render Backend] No records to evict.")
+            if least_valuable_entry is None:
+                log.info("[Render Backend] No records to evict.")
+                return
+
+            utility_score, record_id_to_delete, lookup_count, last_access_epoch = least_valuable_entry
+            del _eviction_entries[record_id_to_delete]
+
+            # Counted as gone now; the delete itself is buffered and sent in a batch
+            _row_count -= 1
+
+        # Stop serving the row from memory, and drop any buffered update that would now fail
+        _gtin_lru_discard_record(record_id_to_delete)
+        with _pending_updates_lock:
+            _pending_updates.pop(record_id_to_delete, None)
+
+        queue_delete(record_id_to_delete)
+        log.info("[Render Backend] 🗑️ Evicted least valuable entry (ID: %s, "
+                 "Lookup Count: %s, "
+                 "Last Access: %s), "
+                 "Utility Score: %.3f).",
+                 record_id_to_delete, lookup_count, last_access_epoch, utility_score)
+    except Exception as e:
+        log.error("[Render Backend] ❌ Error deleting least valuable row: %s", e)
+
+def _persist_to_airtable(gtin, usda_data, analyzed_data):
+    """
+    Runs on the background executor: evicts the least valuable row if the cache
+    is full, then stores the new product data.
+    """
+    try:
+        # Check if cache is full before adding new entry; buffered inserts count towards the limit
+        current_row_count = count_airtable_rows() + pending_insert_count()
+        if current_row_count >= AIRTABLE_MAX_ROWS:
+            delete_least_valuable_row()
+
+        # Store the new product data to Airtable, including the structured analysis results
+        store_to_airtable(gtin, usda_data, analyzed_data)
     except Exception as e:
-        print(f"[Render Backend] ❌ Error deleting least valuable row: {e}")
+        log.exception("[Render Backend] ❌ Background Airtable write failed for GTIN %s: %s", gtin, e)
+
+# Warm the eviction index in the background so the first cache miss doesn't pay for the scan
+if airtable:
+    _executor.submit(count_airtable_rows)
+
+def _drain_airtable_writes():
+    """
+    Runs at interpreter exit (e.g. a worker restart on deploy): waits for in-flight background
+    writes, then flushes the buffered inserts and lookup_count updates, whose timer threads are
+    daemons and would otherwise be dropped.
+    """
+    _executor.shutdown(wait=True)
+    flush_pending_inserts()
+    flush_pending_updates()
+
+atexit.register(_drain_airtable_writes)
+
+
+# GTIN-8, GTIN-12 (UPC-A), GTIN-13 (EAN) or GTIN-14; checked before any cache or USDA I/O
+_GTIN_RE = re.compile(r'\d{8}(?:\d{4,6})?')
+
+def _json(payload, status):
+    """Builds a JSON Response with orjson, which encodes much faster than jsonify's stdlib json.
+    payload can be a dict or a dataclass such as GtinLookupResponse."""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+@dataclass(slots=True)
+class GtinLookupResponse:
+    """
+    gtin-lookup response payload, shared by the cache, USDA and not-found paths.
+    orjson serializes dataclasses directly, so no intermediate dict is built.
+    """
+    gtin: str
+    description: str
+    ingredients: str
+    status: str
+    nova_score: object  # int, or "N/A"
+    nova_description: str
+    identified_fda_non_common: list
+    identified_fda_common: list
+    identified_common_ingredients_only: list
+    truly_unidentified_ingredients: list
+    data_score: float
+    data_completeness_level: str
 
 
 @app.route('/api/gtin-lookup', methods=['POST'])
@@ -781,22 +1569,14 @@ def gtin_lookup():
     Expects a POST request with a JSON body containing 'gtin'.
     Returns JSON response.
     """
-    headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'POST, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type',
-        'Content-Type': 'application/json'
-    }
-
-    if request.method == 'OPTIONS':
-        return '', 204, headers
-
     try:
         request_data = request.get_json(force=True)
         gtin = request_data.get('gtin')
 
         if not gtin:
-            return jsonify({"error": "Bad Request", "message": "GTIN is required in the request body."}), 400, headers
+            return _json({"error": "Bad Request", "message": "GTIN is required in the request body."}, 400)
+        if not isinstance(gtin, str) or not _GTIN_RE.fullmatch(gtin):
+            return _json({"error": "Bad Request", "message": "Invalid GTIN format."}, 400)
 
         # Initialize variables for the response
         product_description = "N/A"
@@ -812,9 +1592,30 @@ def gtin_lookup():
         data_completeness_level = "N/A"
 
 
-        # 1. Check Airtable Cache
-        cached_data = check_airtable_cache(gtin)
+        # 1. Check the in-process cache on this thread; a hit needs no Airtable or USDA work
+        cached_data = check_gtin_lru(gtin)
+        usda_future = None
+        if cached_data is None:
+            # Then the Airtable cache, speculatively fetching from USDA in parallel
+            cache_future = _cache_check_pool.submit(check_airtable_cache, gtin)
+            usda_future, is_leader = _fetch_from_usda_single_flight(gtin)
+            # False when the cache check timed out or failed: the GTIN may well be cached, so
+            # the USDA result is still served but not inserted, which would duplicate the row.
+            cache_checked = True
+            try:
+                cached_data = cache_future.result(timeout=AIRTABLE_CACHE_TIMEOUT_SECONDS)
+            except FutureTimeoutError:
+                log.warning("[Backend] ⚠️ Airtable cache check timed out for GTIN %s. Serving from USDA without caching.", gtin)
+                cached_data = None
+                cache_checked = False
+            except Exception:
+                # Already logged by check_airtable_cache
+                cached_data = None
+                cache_checked = False
         if cached_data:
+            if usda_future is not None:
+                # Found in Airtable: the speculative USDA fetch is only kept if other requests wait on it
+                _release_usda_fetch(gtin, usda_future, is_leader)
             product_description = cached_data.get('description', "N/A")
             product_ingredients = cached_data.get('ingredients', "N/A")
 
@@ -833,49 +1634,31 @@ def gtin_lookup():
             nova_score = cached_data.get('nova_score', "N/A")
             nova_description = cached_data.get('nova_description', "N/A")
 
-            # In case an older cache entry doesn't have the granular data, re-analyze
-            # This block is crucial for ensuring the detailed ingredient objects are returned
-            if (not identified_fda_non_common and not identified_fda_common and 
-                not identified_common_ingredients_only and not truly_unidentified_ingredients and product_ingredients != "N/A"):
-                print("[Backend] Cached data missing granular ingredient breakdown, re-analyzing...")
+            # Re-analyze when the ingredients string is there but the cached FDA lists are empty:
+            # older cache entries may lack the granular breakdown, or Airtable may have stored
+            # empty lists instead of the full objects with 'used_for' etc. This covers the case
+            # where all four lists are empty too, so it's one check and at most one analysis.
+            needs_reanalyze = product_ingredients != "N/A" and not (identified_fda_non_common or identified_fda_common)
+            if needs_reanalyze:
+                log.info("[Backend] Cached FDA lists are empty, re-analyzing to populate details...")
                 (identified_fda_non_common, identified_fda_common, identified_common_ingredients_only,
                  truly_unidentified_ingredients, data_score, data_completeness_level,
                  nova_score, nova_description) = analyze_ingredients(product_ingredients)
                 # Potentially update the Airtable record with new granular data here if desired
                 # For now, we just ensure the response contains the re-analyzed data.
-            elif product_ingredients != "N/A": # If ingredients exist, but the lists might be empty from cache
-                 # Re-analyze to ensure ingredient objects with 'used_for' etc. are created
-                 # This is a defensive measure if Airtable somehow stored empty lists or simple strings
-                 # instead of the full objects.
-                 # Only re-analyze if the lists are empty, but ingredients string is not "N/A"
-                if not identified_fda_non_common and not identified_fda_common:
-                    print("[Backend] Cached FDA lists are empty, re-analyzing to populate details...")
-                    (identified_fda_non_common, identified_fda_common, identified_common_ingredients_only,
-                     truly_unidentified_ingredients, data_score, data_completeness_level,
-                     nova_score, nova_description) = analyze_ingredients(product_ingredients)
 
 
             status = "found_in_cache"
 
             # Prepare the response with structured data
-            response_data = {
-                "gtin": gtin,
-                "description": product_description,
-                "ingredients": product_ingredients,
-                "status": status,
-                "nova_score": nova_score,
-                "nova_description": nova_description,
-                "identified_fda_non_common": identified_fda_non_common,
-                "identified_fda_common": identified_fda_common,
-                "identified_common_ingredients_only": identified_common_ingredients_only,
-                "truly_unidentified_ingredients": truly_unidentified_ingredients,
-                "data_score": data_score,
-                "data_completeness_level": data_completeness_level
-            }
-            return jsonify(response_data), 200, headers
+            response_data = GtinLookupResponse(
+                gtin, product_description, product_ingredients, status, nova_score, nova_description,
+                identified_fda_non_common, identified_fda_common, identified_common_ingredients_only,
+                truly_unidentified_ingredients, data_score, data_completeness_level)
+            return _json(response_data, 200)
 
-        # 2. If not in cache, fetch from USDA API
-        usda_product_data = fetch_from_usda_api(gtin)
+        # 2. If not in cache, use the USDA API result
+        usda_product_data = usda_future.result()
 
         if usda_product_data:
             product_description = usda_product_data.get('description', "N/A")
@@ -900,61 +1683,35 @@ def gtin_lookup():
                 "nova_description": nova_description
             }
 
-            # Check if cache is full before adding new entry
-            current_row_count = count_airtable_rows()
-            if current_row_count >= AIRTABLE_MAX_ROWS:
-                delete_least_valuable_row()
-
-            # Store the new product data to Airtable, including the structured analysis results
-            store_to_airtable(gtin, usda_product_data, analyzed_data_for_cache)
+            # Check capacity, evict and store in the background; the response doesn't depend on it.
+            # Only the request that started the USDA fetch writes, so coalesced duplicates don't
+            # insert the same GTIN twice, and only once the cache check has confirmed a miss.
+            if is_leader and cache_checked:
+                _executor.submit(_persist_to_airtable, gtin, usda_product_data, analyzed_data_for_cache)
 
             # Prepare the response with structured data
-            response_data = {
-                "gtin": gtin,
-                "description": product_description,
-                "ingredients": product_ingredients,
-                "status": status,
-                "nova_score": nova_score,
-                "nova_description": nova_description,
-                "identified_fda_non_common": identified_fda_non_common,
-                "identified_fda_common": identified_fda_common,
-                "identified_common_ingredients_only": identified_common_ingredients_only,
-                "truly_unidentified_ingredients": truly_unidentified_ingredients,
-                "data_score": data_score,
-                "data_completeness_level": data_completeness_level
-            }
-            return jsonify(response_data), 200, headers
+            response_data = GtinLookupResponse(
+                gtin, product_description, product_ingredients, status, nova_score, nova_description,
+                identified_fda_non_common, identified_fda_common, identified_common_ingredients_only,
+                truly_unidentified_ingredients, data_score, data_completeness_level)
+            return _json(response_data, 200)
         else:
             # Product not found scenario
-            return jsonify({
-                "gtin": gtin,
-                "description": "N/A",
-                "ingredients": "N/A",
-                "status": "not_found",
-                "nova_score": "N/A",
-                "nova_description": "Cannot determine NOVA score.",
-                "identified_fda_non_common": [],
-                "identified_fda_common": [],
-                "identified_common_ingredients_only": [],
-                "truly_unidentified_ingredients": [],
-                "data_score": 0.0,
-                "data_completeness_level": "N/A"
-            }), 404, headers
+            return _json(GtinLookupResponse(
+                gtin, "N/A", "N/A", "not_found", "N/A", "Cannot determine NOVA score.",
+                [], [], [], [], 0.0, "N/A"), 404)
 
     except requests.exceptions.RequestException as e:
-        print(f"[Render Backend] Network or USDA API error caught: {e}")
-        return jsonify({"error": "Failed to connect to USDA FoodData Central or network issue.", "details": str(e)}), 500, headers
+        log.error("[Render Backend] Network or USDA API error caught: %s", e)
+        return _json({"error": "Failed to connect to USDA FoodData Central or network issue.", "details": str(e)}, 500)
     except Exception as e:
-        print(f"[Render Backend] An unexpected error occurred in handler: {e}")
-        traceback.print_exc()
-        return jsonify({"error": "An internal server error occurred.", "details": str(e)}), 500, headers
+        log.exception("[Render Backend] An unexpected error occurred in handler: %s", e)
+        return _json({"error": "An internal server error occurred.", "details": str(e)}, 500)
 
 
 # Standard way to run Flask app for local testing
 if __name__ == "__main__":
     if not all([AIRTABLE_API_KEY, AIRTABLE_BASE_ID, USDA_API_KEY]):
-        print(
-            "WARNING: Missing one or more environment variables (AIRTABLE_API_KEY, AIRTABLE_BASE_ID, USDA_API_KEY)."
-        )
-        print("Please set them for local testing or deployment.")
+        log.warning("[Backend Init] ⚠️ Missing one or more environment variables (AIRTABLE_API_KEY, AIRTABLE_BASE_ID, USDA_API_KEY). "
+                    "Please set them for local testing or deployment.")
     app.run(debug=True, host='0.0.0.0', port=os.environ.get('PORT', 5000))
@@ -240,39 +240,40 @@ def generate_data_report_markdown(identified_fda_substances, identified_common_i
     """
     Generates a markdown-formatted data report for the product.
     """
-    report = "## Ingredient Data Report\n\n"
-    report += f"**Data Score:** {data_score:.1f}% ({data_completeness_level})\n\n"
-    report += "The Data Score indicates the percentage of ingredients our system could categorize.\n\n"
+    # Parts are collected in a list and joined once, instead of rebuilding the string on every +=
+    report_parts = ["## Ingredient Data Report\n\n"]
+    report_parts.append(f"**Data Score:** {data_score:.1f}% ({data_completeness_level})\n\n")
+    report_parts.append("The Data Score indicates the percentage of ingredients our system could categorize.\n\n")
 
-    report += "### Identified FDA-Regulated Substances:\n"
+    report_parts.append("### Identified FDA-Regulated Substances:\n")
     if identified_fda_substances:
         for sub in sorted(identified_fda_substances):
-            report += f"* {sub.title()}\n"
+            report_parts.append(f"* {sub.title()}\n")
     else:
-        report += "* No specific FDA-regulated substances (additives) identified.\n"
+        report_parts.append("* No specific FDA-regulated substances (additives) identified.\n")
 
-    report += "\n### Identified Common Food Ingredients:\n"
+    report_parts.append("\n### Identified Common Food Ingredients:\n")
     if identified_common_ingredients:
         for common_ing in sorted(identified_common_ingredients):
-            report += f"* {common_ing.title()}\n"
+            report_parts.append(f"* {common_ing.title()}\n")
     else:
-        report += "* No common food ingredients identified (beyond FDA-regulated substances).\n"
+        report_parts.append("* No common food ingredients identified (beyond FDA-regulated substances).\n")
 
-    report += "\n### Truly Unidentified Ingredients/Phrases:\n"
+    report_parts.append("\n### Truly Unidentified Ingredients/Phrases:\n")
     if truly_unidentified_ingredients:
-        report += "The following components were not matched against our database of FDA-regulated substances or common ingredients. This means our system couldn't fully categorize them. These could be:\n"
-        report += "* **Complex phrasing** not yet fully parsed.\n"
-        report += "* **Obscure ingredients** not yet in our database.\n"
-        report += "* **Potential misspellings** from the label.\n\n"
-        report += "We'll keep improving. The more you use, the better we get!!\n" # Updated message
+        report_parts.append("The following components were not matched against our database of FDA-regulated substances or common ingredients. This means our system couldn't fully categorize them. These could be:\n")
+        report_parts.append("* **Complex phrasing** not yet fully parsed.\n")
+        report_parts.append("* **Obscure ingredients** not yet in our database.\n")
+        report_parts.append("* **Potential misspellings** from the label.\n\n")
+        report_parts.append("We'll keep improving. The more you use, the better we get!!\n") # Updated message
         for unident in sorted(truly_unidentified_ingredients):
-            report += f"* {unident.title()}\n"
+            report_parts.append(f"* {unident.title()}\n")
     else:
-        report += "* All ingredient components were successfully categorized!\n"
+        report_parts.append("* All ingredient components were successfully categorized!\n")
     
-    report += "\n---\n"
-    report += "*Data Score reflects the percentage of parsed ingredient components that matched known FDA-regulated substances or common food ingredients.*"
-    return report
+    report_parts.append("\n---\n")
+    report_parts.append("*Data Score reflects the percentage of parsed ingredient components that matched known FDA-regulated substances or common food ingredients.*")
+    return "".join(report_parts)
 
 
 if __name__ == "__main__":
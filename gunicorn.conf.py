@@ -0,0 +1,15 @@
+"""
+Gunicorn configuration for the Render backend.
+
+/gtin-lookup spends nearly all of its time waiting on Airtable and USDA,
+so each worker runs a pool of threads (gthread) and overlaps those waits
+instead of blocking a whole worker per scan.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+keepalive = 5
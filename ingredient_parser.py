@@ -1,11 +1,16 @@
 # FILE: backend/ingredient_parser.py
 
-import json
 import re
+import orjson  # Faster parsing for the startup data files
 import os
+import logging
 import pandas as pd
 import sys
 
+# Loader and categorization messages go through the logger, so the per-ingredient
+# debug lines cost nothing unless DEBUG is enabled by the importing service.
+log = logging.getLogger(__name__)
+
 def load_patterns(file_path="data/ingredient_naming_patterns.json"):
     """
     Loads descriptive modifiers, parenthetical examples, and punctuation patterns from JSON.
@@ -13,14 +18,15 @@ def load_patterns(file_path="data/ingredient_naming_patterns.json"):
     try:
         # Construct absolute path for consistency
         abs_file_path = os.path.join(os.path.dirname(__file__), file_path)
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            patterns = json.load(f)
-        print(f"Loaded patterns from: {abs_file_path}")
+        with open(abs_file_path, 'rb') as f:
+            patterns = orjson.loads(f.read())
+        _pattern_regexes(patterns) # Compile the keyword regexes now rather than on the first parse
+        log.info("Loaded patterns from: %s", abs_file_path)
         return patterns
     except FileNotFoundError:
-        print(f"Error: Pattern file not found at {abs_file_path}. Please ensure it exists.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {abs_file_path}. Please check file format.")
+        log.error("Error: Pattern file not found at %s. Please ensure it exists.", abs_file_path)
+    except orjson.JSONDecodeError:
+        log.error("Error: Could not decode JSON from %s. Please check file format.", abs_file_path)
     return {}
 
 def load_fda_substances(file_path="data/all_fda_substances_full_live.json"):
@@ -33,8 +39,8 @@ def load_fda_substances(file_path="data/all_fda_substances_full_live.json"):
     try:
         # Construct absolute path for consistency
         abs_file_path = os.path.join(os.path.dirname(__file__), file_path)
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(abs_file_path, 'rb') as f:
+            data = orjson.loads(f.read())
 
         for item in data:
             # CORRECTED: Use the actual keys from your JSON file
@@ -46,12 +52,12 @@ def load_fda_substances(file_path="data/all_fda_substances_full_live.json"):
             for alias in item.get("Other Names", []):
                 fda_substances_map[alias.lower()] = item
         
-        print(f"Loaded FDA substances map from: {abs_file_path} (Items loaded: {len(fda_substances_map)})")
+        log.info("Loaded FDA substances map from: %s (Items loaded: %s)", abs_file_path, len(fda_substances_map))
         return fda_substances_map
     except FileNotFoundError:
-        print(f"Error: FDA substances file not found at {abs_file_path}. Please ensure it exists.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {abs_file_path}. Please check file format.")
+        log.error("Error: FDA substances file not found at %s. Please ensure it exists.", abs_file_path)
+    except orjson.JSONDecodeError:
+        log.error("Error: Could not decode JSON from %s. Please check file format.", abs_file_path)
     return {}
 
 def load_ingredient_aliases(file_path="data/ingredient_aliases.json"):
@@ -63,14 +69,14 @@ def load_ingredient_aliases(file_path="data/ingredient_aliases.json"):
     aliases_map = {}
     try:
         abs_file_path = os.path.join(os.path.dirname(__file__), file_path)
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            aliases_map = json.load(f)
-        print(f"Loaded ingredient aliases from: {abs_file_path} (Items loaded: {len(aliases_map)})")
+        with open(abs_file_path, 'rb') as f:
+            aliases_map = orjson.loads(f.read())
+        log.info("Loaded ingredient aliases from: %s (Items loaded: %s)", abs_file_path, len(aliases_map))
         return aliases_map
     except FileNotFoundError:
-        print(f"Error: Ingredient aliases file not found at {abs_file_path}. Please ensure it exists.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {abs_file_path}. Please check file format.")
+        log.error("Error: Ingredient aliases file not found at %s. Please ensure it exists.", abs_file_path)
+    except orjson.JSONDecodeError:
+        log.error("Error: Could not decode JSON from %s. Please check file format.", abs_file_path)
     return {}
 
 def load_common_ingredients(file_path="data/common_ingredients_live.json"):
@@ -81,16 +87,16 @@ def load_common_ingredients(file_path="data/common_ingredients_live.json"):
     common_ingredients_set = set()
     try:
         abs_file_path = os.path.join(os.path.dirname(__file__), file_path)
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(abs_file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         # Assumes common_ingredients.json is a flat list of strings
         common_ingredients_set = set(item.lower() for item in data)
-        print(f"Loaded common ingredients from: {abs_file_path} (Items loaded: {len(common_ingredients_set)})")
+        log.info("Loaded common ingredients from: %s (Items loaded: %s)", abs_file_path, len(common_ingredients_set))
         return common_ingredients_set
     except FileNotFoundError:
-        print(f"Error: Common ingredients file not found at {abs_file_path}. Please ensure it exists.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {abs_file_path}. Please check file format.")
+        log.error("Error: Common ingredients file not found at %s. Please ensure it exists.", abs_file_path)
+    except orjson.JSONDecodeError:
+        log.error("Error: Could not decode JSON from %s. Please check file format.", abs_file_path)
     return set()
 
 # NEW FUNCTION: Load common FDA additives from a separate file
@@ -102,27 +108,47 @@ def load_common_fda_additives(file_path="data/common_fda_additives.json"):
     common_fda_additives_set = set()
     try:
         abs_file_path = os.path.join(os.path.dirname(__file__), file_path)
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(abs_file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         common_fda_additives_set = set(item.lower() for item in data)
-        print(f"Loaded common FDA additives from: {abs_file_path} (Items loaded: {len(common_fda_additives_set)})")
+        log.info("Loaded common FDA additives from: %s (Items loaded: %s)", abs_file_path, len(common_fda_additives_set))
         return common_fda_additives_set
     except FileNotFoundError:
-        print(f"Warning: Common FDA additives file not found at {abs_file_path}. Proceeding without common FDA classification.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {abs_file_path}. Please check file format.")
+        log.warning("Warning: Common FDA additives file not found at %s. Proceeding without common FDA classification.", abs_file_path)
+    except orjson.JSONDecodeError:
+        log.error("Error: Could not decode JSON from %s. Please check file format.", abs_file_path)
     return set()
 
+# Regexes used on every parsed phrase, compiled once at import instead of going through
+# re's pattern cache on each call.
+_NORMALIZE_PAREN_RE = re.compile(r'\((.*?)\)')
+_NORMALIZE_BRACKET_RE = re.compile(r'\[.*?\]')
+_NORMALIZE_PUNCTUATION_RE = re.compile(r'[.,;!?:/\\-_"\'`]+')
+_PARENTHETICAL_MATCH_RE = re.compile(r'\((.*?)\)|\[(.*?)\]')
+_PARENTHETICAL_STRIP_RE = re.compile(r'\s*\(.*?\)\s*|\s*\[.*?\]\s*')
+_PERCENTAGE_RE = re.compile(r'\d+(\.\d+)?%\s*')
+_AS_A_FOR_RE = re.compile(r'\s*(as a|for)\s+\w+\b')
+_USED_AS_RE = re.compile(r'\s*used as\s+\w+\b')
+_CONTAINS_RE = re.compile(r'contains\s+[\w\s,]+')
+_FLAVOR_RE = re.compile(r'\b(natural|artificial)\s*flavor(ing)?s?\b')
+_AND_ARTIFICIAL_FLAVOR_RE = re.compile(r'\b(and\s*)?artificial\s*flavor(ing)?s?\b')
+_COLOR_RE = re.compile(r'\b(color|colors|colour|colours)\b')
+_PROCESSING_MODIFIER_RE = re.compile(r'\b(modified|enriched|bleached|fortified)\s*')
+_ORGANIC_RE = re.compile(r'\borganic\s*')
+_NON_ALPHA_RE = re.compile(r'[^a-z\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_UNUSUAL_PUNCTUATION_RE = re.compile(r'[\[\]{}<>/\\~!@#$%^&*`"\'_+=|]')
+
 def normalize_string(s):
     """Normalizes a string by converting to lowercase and removing extra spaces and common punctuation."""
     if not isinstance(s, str):
         return ""
     s = s.lower()
     # Remove content in parentheses and brackets
-    s = re.sub(r'\((.*?)\)', '', s)
-    s = re.sub(r'\[.*?\]', '', s)
+    s = _NORMALIZE_PAREN_RE.sub('', s)
+    s = _NORMALIZE_BRACKET_RE.sub('', s)
     # Replace common punctuation with spaces
-    s = re.sub(r'[.,;!?:/\\-_"\'`]+', ' ', s)
+    s = _NORMALIZE_PUNCTUATION_RE.sub(' ', s)
     s = s.strip() # THIS IS THE PREVIOUS FIX: ensure it's s.strip()
     return s
 
@@ -135,6 +161,36 @@ def normalize_string(s):
 #         return re.sub(r'[^a-z0-9\s]', '', s.lower()).strip()
 #     return ""
 
+def _keyword_regexes(pattern_groups, flags=0):
+    """
+    Compiles each group of keyword patterns (e.g. patterns_data["descriptive_modifiers"]) into a
+    single \b(?:p1|p2|...)\b regex per key, so a phrase is scanned once per key instead of once
+    per pattern. Returns a list of (key, compiled_regex) in the groups' order.
+    """
+    return [
+        (key, re.compile(r'\b(?:' + '|'.join(re.escape(pattern) for pattern in patterns) + r')\b', flags))
+        for key, patterns in pattern_groups.items() if patterns
+    ]
+
+# (patterns_data, parenthetical_examples regexes, descriptive_modifiers regexes) for the
+# patterns object last used. Kept outside patterns_data so it stays plain JSON data.
+_PATTERN_REGEXES = (None, (), ())
+
+def _pattern_regexes(patterns_data):
+    """
+    Returns (parenthetical_examples regexes, descriptive_modifiers regexes) for patterns_data,
+    compiling them only when a different patterns object is passed in. patterns_data is loaded
+    once and not modified afterwards, so one slot is enough.
+    """
+    global _PATTERN_REGEXES
+    cached = _PATTERN_REGEXES
+    if cached[0] is not patterns_data:
+        cached = (patterns_data,
+                  _keyword_regexes(patterns_data.get("parenthetical_examples", {}), re.IGNORECASE),
+                  _keyword_regexes(patterns_data.get("descriptive_modifiers", {})))
+        _PATTERN_REGEXES = cached
+    return cached[1], cached[2]
+
 def parse_ingredient_string(ingredients_raw, patterns_data, ingredient_aliases_map=None):
     """
     Parses a raw string of ingredients (e.g., from a food label) into a list of structured
@@ -145,6 +201,9 @@ def parse_ingredient_string(ingredients_raw, patterns_data, ingredient_aliases_m
     if not isinstance(ingredients_raw, str) or not ingredients_raw.strip():
         return parsed_ingredients_list
 
+    if patterns_data:
+        parenthetical_regexes, modifier_regexes = _pattern_regexes(patterns_data)
+
     # This regex splits by comma, semicolon, or "and", but not inside parentheses.
     # It accounts for various common delimiters and edge cases.
     # Note: Using `re.split` with a regex that handles "and" outside of parentheses is complex.
@@ -166,10 +225,13 @@ def parse_ingredient_string(ingredients_raw, patterns_data, ingredient_aliases_m
         }
 
         temp_base_ingredient = ingredient_phrase # Start with the full phrase
+        # The phrase with all ( ) / [ ] content removed. Used for the base ingredient below and
+        # again for the punctuation check in step 4, so it's only computed once.
+        phrase_without_parentheticals = _PARENTHETICAL_STRIP_RE.sub(' ', ingredient_phrase)
 
         # 1. Extract and store parenthetical information
         # Matches content in ( ) or [ ]
-        parenthetical_matches = re.findall(r'\((.*?)\)|\[(.*?)\]', temp_base_ingredient)
+        parenthetical_matches = _PARENTHETICAL_MATCH_RE.findall(temp_base_ingredient)
         if parenthetical_matches:
             for match in parenthetical_matches:
                 # Take the non-empty group (either from () or [])
@@ -179,13 +241,10 @@ def parse_ingredient_string(ingredients_raw, patterns_data, ingredient_aliases_m
                 # Try to categorize parenthetical content using patterns
                 categorized = False
                 if patterns_data and "parenthetical_examples" in patterns_data:
-                    for key, pattern_list in patterns_data["parenthetical_examples"].items():
-                        for pattern in pattern_list:
-                            if re.search(r'\b' + re.escape(pattern) + r'\b', content, re.IGNORECASE):
-                                parsed_ingredient_info["parenthetical_info"][key] = content
-                                categorized = True
-                                break
-                        if categorized:
+                    for key, key_regex in parenthetical_regexes:
+                        if key_regex.search(content):
+                            parsed_ingredient_info["parenthetical_info"][key] = content
+                            categorized = True
                             break
                 
                 # If not categorized by specific examples, store it under 'other'
@@ -196,39 +255,39 @@ def parse_ingredient_string(ingredients_raw, patterns_data, ingredient_aliases_m
                     parsed_ingredient_info["parenthetical_info"]["other"].append(content)
             
             # Remove ALL parenthetical content from the base string for primary parsing
-            temp_base_ingredient = re.sub(r'\s*\(.*?\)\s*|\s*\[.*?\]\s*', ' ', temp_base_ingredient).strip()
+            temp_base_ingredient = phrase_without_parentheticals.strip()
             
         # 2. Aggressively clean the base_ingredient for lookup
         # Convert to lowercase for consistent processing
         cleaned_base = temp_base_ingredient.lower()
 
         # Remove percentages (e.g., "0.1% ", "5%")
-        cleaned_base = re.sub(r'\d+(\.\d+)?%\s*', '', cleaned_base)
+        cleaned_base = _PERCENTAGE_RE.sub('', cleaned_base)
         
         # Remove "as a X", "for Y" phrases from the base for lookup
         # e.g., "citric acid as a preservative" -> "citric acid"
-        cleaned_base = re.sub(r'\s*(as a|for)\s+\w+\b', '', cleaned_base)
-        cleaned_base = re.sub(r'\s*used as\s+\w+\b', '', cleaned_base) # Catch "used as"
+        cleaned_base = _AS_A_FOR_RE.sub('', cleaned_base)
+        cleaned_base = _USED_AS_RE.sub('', cleaned_base) # Catch "used as"
 
         # Remove "contains X" (e.g., "contains one or more of the following")
-        cleaned_base = re.sub(r'contains\s+[\w\s,]+', '', cleaned_base)
+        cleaned_base = _CONTAINS_RE.sub('', cleaned_base)
 
         # Remove other common trailing descriptors for base ingredient clarity
         # These are usually flavor or color descriptors
-        cleaned_base = re.sub(r'\b(natural|artificial)\s*flavor(ing)?s?\b', '', cleaned_base)
-        cleaned_base = re.sub(r'\b(and\s*)?artificial\s*flavor(ing)?s?\b', '', cleaned_base)
-        cleaned_base = re.sub(r'\b(color|colors|colour|colours)\b', '', cleaned_base) # Remove generic color/colour
+        cleaned_base = _FLAVOR_RE.sub('', cleaned_base)
+        cleaned_base = _AND_ARTIFICIAL_FLAVOR_RE.sub('', cleaned_base)
+        cleaned_base = _COLOR_RE.sub('', cleaned_base) # Remove generic color/colour
 
         # Remove "modified", "enriched", "bleached" as they are modifiers, not core ingredients
-        cleaned_base = re.sub(r'\b(modified|enriched|bleached|fortified)\s*', '', cleaned_base)
+        cleaned_base = _PROCESSING_MODIFIER_RE.sub('', cleaned_base)
         
         # Remove "organic"
-        cleaned_base = re.sub(r'\borganic\s*', '', cleaned_base)
+        cleaned_base = _ORGANIC_RE.sub('', cleaned_base)
 
         # Final cleaning: remove any remaining non-alphanumeric characters (keep spaces)
         # and reduce multiple spaces
-        cleaned_base = re.sub(r'[^a-z\s]', '', cleaned_base).strip()
-        cleaned_base = re.sub(r'\s+', ' ', cleaned_base).strip()
+        cleaned_base = _NON_ALPHA_RE.sub('', cleaned_base).strip()
+        cleaned_base = _WHITESPACE_RE.sub(' ', cleaned_base).strip()
         
         # If after aggressive cleaning, the base_ingredient became empty or too short,
         # revert to a less aggressive clean for the base to ensure we don't lose the main ingredient.
@@ -247,19 +306,17 @@ def parse_ingredient_string(ingredients_raw, patterns_data, ingredient_aliases_m
         # 3. Extract and store descriptive modifiers (e.g., "natural", "organic")
         # These are found from the *original* ingredient phrase before aggressive cleaning
         if patterns_data and "descriptive_modifiers" in patterns_data:
-            for modifier_key, modifier_patterns in patterns_data["descriptive_modifiers"].items():
-                for pattern in modifier_patterns:
-                    # Search in the original phrase or a less cleaned version if needed
-                    if re.search(r'\b' + re.escape(pattern) + r'\b', ingredient_phrase.lower()):
-                        # Only add if not already in modifiers to avoid duplicates
-                        if modifier_key not in parsed_ingredient_info["modifiers"]:
-                            parsed_ingredient_info["modifiers"].append(modifier_key)
-                        break # Found a pattern for this modifier key, move to next key
+            ingredient_phrase_lower = ingredient_phrase.lower() # Lowercased once, not per key
+            for modifier_key, modifier_regex in modifier_regexes:
+                # Search in the original phrase or a less cleaned version if needed
+                if modifier_regex.search(ingredient_phrase_lower):
+                    # Only add if not already in modifiers to avoid duplicates
+                    if modifier_key not in parsed_ingredient_info["modifiers"]:
+                        parsed_ingredient_info["modifiers"].append(modifier_key)
 
         # 4. Check for unusual punctuation (excluding those handled by parentheticals)
         # Use the original ingredient phrase, but strip parenthetical content from it first
-        cleaned_phrase_for_punc_check = re.sub(r'\s*\(.*?\)\s*|\s*\[.*?\]\s*', ' ', ingredient_phrase)
-        if re.search(r'[\[\]{}<>/\\~!@#$%^&*`"\'_+=|]', cleaned_phrase_for_punc_check):
+        if _UNUSUAL_PUNCTUATION_RE.search(phrase_without_parentheticals):
             # Only add "other" if not already present
             if "other" not in parsed_ingredient_info["unusual_punctuation_found"]:
                 parsed_ingredient_info["unusual_punctuation_found"].append("other")
@@ -277,14 +334,14 @@ def categorize_parsed_ingredients(parsed_ingredients, fda_substances_map, common
     truly_unidentified = []
     all_fda_parsed_for_report = [] # Changed back to a list of dicts like {"name": ..., "is_common": ...}
 
-    print(f"DEBUG_PARSER: Starting categorization for {len(parsed_ingredients)} ingredients.")
+    log.debug("DEBUG_PARSER: Starting categorization for %s ingredients.", len(parsed_ingredients))
 
     for ingredient in parsed_ingredients:
         category = ingredient.get("trust_report_category")
         base_ingredient = ingredient.get("base_ingredient")
         original_string = ingredient.get("original_string")
 
-        print(f"DEBUG_PARSER: Processing: '{original_string}' (Base: '{base_ingredient}') - Initial Category: '{category}'")
+        log.debug("DEBUG_PARSER: Processing: '%s' (Base: '%s') - Initial Category: '%s'", original_string, base_ingredient, category)
 
         fda_substance_obj = fda_substances_map.get(base_ingredient)
 
@@ -292,7 +349,7 @@ def categorize_parsed_ingredients(parsed_ingredients, fda_substances_map, common
             # Get the correct substance name from the FDA object
             fda_substance_name = fda_substance_obj.get("Substance Name (Heading)", base_ingredient) # Use correct key
 
-            print(f"DEBUG_PARSER: Match found in fda_substances_map for '{base_ingredient}': {fda_substance_name}")
+            log.debug("DEBUG_PARSER: Match found in fda_substances_map for '%s': %s", base_ingredient, fda_substance_name)
 
             # Check if this FDA substance is in our list of common FDA additives
             if fda_substance_name.lower() in common_fda_additives_set: # Use the new set for lookup
@@ -312,7 +369,7 @@ def categorize_parsed_ingredients(parsed_ingredients, fda_substances_map, common
             ingredient["trust_report_category"] = "truly_unidentified"
             truly_unidentified.append(ingredient)
 
-        print(f"DEBUG_PARSER: Final category for '{original_string}' (Base: '{base_ingredient}'): {ingredient.get('trust_report_category')}")
+        log.debug("DEBUG_PARSER: Final category for '%s' (Base: '%s'): %s", original_string, base_ingredient, ingredient.get('trust_report_category'))
 
     return parsed_fda_common, parsed_fda_non_common, parsed_common_only, truly_unidentified, all_fda_parsed_for_report
 
@@ -398,6 +455,9 @@ def get_nova_description(nova_score):
 
 
 if __name__ == '__main__':
+    # Show the loader messages when run directly
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     # Test loading patterns
     patterns = load_patterns()
     if not patterns:
@@ -1,12 +1,18 @@
 # FILE: backend/ingredient_parser_service.py
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 from report_generator import generate_trust_report_html
-import json
+import orjson
 import os
 import sys
 import datetime
+import logging
+
+# Per-request messages go through the logger so they are only formatted when enabled.
+# Set LOG_LEVEL=DEBUG to see the raw/parsed ingredient dumps locally.
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
+log = logging.getLogger(__name__)
 
 # ✅ Setup Flask app and CORS
 app = Flask(__name__)
@@ -34,17 +40,17 @@ try:
         get_nova_description,
         load_ingredient_aliases
     )
-    print("✅ Successfully imported ingredient_parser functions.")
+    log.info("✅ Successfully imported ingredient_parser functions.")
 except ImportError as e:
-    print(f"❌ Error importing ingredient_parser: {e}")
+    log.critical("❌ Error importing ingredient_parser: %s", e)
     sys.exit(1)
 
 # Import fetch_product_from_usda from usda.py (assuming usda.py exists and has this function)
 try:
     from usda import fetch_product_from_usda
-    print("✅ Successfully imported fetch_product_from_usda from usda.py.")
+    log.info("✅ Successfully imported fetch_product_from_usda from usda.py.")
 except ImportError as e:
-    print(f"❌ Error importing usda.py: {e}")
+    log.critical("❌ Error importing usda.py: %s", e)
     sys.exit(1)
 
 
@@ -53,14 +59,14 @@ DATA_DIR = os.path.join(current_dir, "data")
 GTIN_MAP_PATH = os.path.join(DATA_DIR, "gtin_map.json")
 
 try:
-    with open(GTIN_MAP_PATH, "r") as f:
-        gtin_to_fdc = json.load(f)
-    print("✅ gtin_map.json loaded successfully.")
+    with open(GTIN_MAP_PATH, "rb") as f:
+        gtin_to_fdc = orjson.loads(f.read())
+    log.info("✅ gtin_map.json loaded successfully.")
 except FileNotFoundError:
-    print(f"[Startup Error] gtin_map.json not found at: {GTIN_MAP_PATH}. Initializing empty map.")
+    log.error("[Startup Error] gtin_map.json not found at: %s. Initializing empty map.", GTIN_MAP_PATH)
     gtin_to_fdc = {}
-except json.JSONDecodeError as e:
-    print(f"[Startup Error] Failed to decode gtin_map.json: {e}. Initializing empty map.")
+except orjson.JSONDecodeError as e:
+    log.error("[Startup Error] Failed to decode gtin_map.json: %s. Initializing empty map.", e)
     gtin_to_fdc = {}
 
 # --- Global data loading for ingredient_parser functions ---
@@ -76,14 +82,18 @@ try:
     ingredient_aliases_map = load_ingredient_aliases()
 
     if not patterns_data or not fda_substances_map or not common_ingredients_set or not common_fda_additives_set or not ingredient_aliases_map:
-        print("❌ Critical: Some essential parsing data failed to load. App may not function correctly.")
+        log.critical("❌ Critical: Some essential parsing data failed to load. App may not function correctly.")
         sys.exit(1) # Exit if critical data isn't loaded
     else:
-        print("✅ All ingredient parser data loaded successfully.")
+        log.info("✅ All ingredient parser data loaded successfully.")
 except Exception as e:
-    print(f"❌ Error loading ingredient parser data: {e}")
+    log.critical("❌ Error loading ingredient parser data: %s", e)
     sys.exit(1)
 
+# orjson Response for the /gtin-lookup result; error bodies still use jsonify
+def json_response(payload, status=200):
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 @app.route('/')
 def home():
     """Basic home route to confirm service is running."""
@@ -94,14 +104,15 @@ def test_cache():
     """
     A temporary endpoint to simulate writing to cache and confirm data structure.
     As per 'onboarding_sgl_gtin_cache_072720251656.md', caching is deferred to MVP+1.
-    This function is a no-op in MVP, so it just prints a message and returns None.
+    This function is a no-op in MVP, so it just logs a message and returns None.
     """
     test_gtin = "1234567890123" # Example GTIN
-    print(f"Attempted to write test GTIN {test_gtin} to cache (no-op in MVP).")
+    log.info("Attempted to write test GTIN %s to cache (no-op in MVP).", test_gtin)
     return jsonify({"message": f"Attempted to write test GTIN {test_gtin} to cache (no-op in MVP)."}), 200
 
 @app.route('/gtin-lookup', methods=['POST'])
 def gtin_lookup():
+    gtin = None
     try:
         data = request.get_json()
         gtin = data.get('gtin')
@@ -129,8 +140,8 @@ def gtin_lookup():
         if not ingredients_raw or ingredients_raw == 'N/A':
             return jsonify({"error": "No ingredients found for this product."}), 404
 
-        # DEBUG: Print raw ingredients from USDA
-        print(f"DEBUG_SERVICE: Raw Ingredients: {ingredients_raw}")
+        # DEBUG: Log raw ingredients from USDA
+        log.debug("DEBUG_SERVICE: Raw Ingredients: %s", ingredients_raw)
 
         # 2. Parse ingredients using the globally loaded data
         parsed_ingredients = parse_ingredient_string(
@@ -138,7 +149,7 @@ def gtin_lookup():
             patterns_data,
             ingredient_aliases_map
         )
-        print(f"DEBUG_SERVICE: Parsed Ingredients (from service): {parsed_ingredients}")
+        log.debug("DEBUG_SERVICE: Parsed Ingredients (from service): %s", parsed_ingredients)
 
         # 3. Categorize parsed ingredients using all loaded data
         parsed_fda_common, parsed_fda_non_common, parsed_common_only, truly_unidentified, all_fda_parsed_for_report = \
@@ -175,8 +186,8 @@ def gtin_lookup():
             all_fda_parsed_for_report=all_fda_parsed_for_report
         )
         # 7. Return response
-        print(f"✅ Successfully processed GTIN {gtin}. Returning response.")
-        return jsonify({
+        log.info("✅ Successfully processed GTIN %s. Returning response.", gtin)
+        return json_response({
             "gtin": gtin,
             "fdc_id": fdc_id,
             "brand_name": brand_name,
@@ -196,12 +207,11 @@ def gtin_lookup():
         })
 
     except Exception as e:
-        print(f"❌ Error in /gtin-lookup for GTIN {gtin}: {str(e)}")
-        import traceback
-        traceback.print_exc() # Print full traceback for debugging
+        # log.exception records the full traceback for debugging
+        log.exception("❌ Error in /gtin-lookup for GTIN %s: %s", gtin, e)
         return jsonify({"error": str(e)}), 500
 
 # This block ensures the app runs when executed directly
 if __name__ == '__main__':
-    print("Running Flask app locally...")
+    log.info("Running Flask app locally...")
     app.run(debug=True, host='0.0.0.0', port=os.environ.get('PORT', 5000)) # Use PORT env var or default 5000
\ No newline at end of file
@@ -1,4 +1,5 @@
 import html
+import io
 
 # --- Step 1: Module-level Constants ---
 CATEGORY_DISPLAY_NAMES = {
@@ -118,11 +119,13 @@ def generate_trust_report_html(
     :return: A string containing the full HTML of the trust report.
     """
 
-    html_content = []
+    # Sections are written straight into one buffer instead of collected in a list and joined
+    buf = io.StringIO()
+    w = buf.write
 
     # Head and basic body structure
     # REMOVED: COLLAPSIBLE_JS from here
-    html_content.append("""
+    w("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -135,7 +138,7 @@ def generate_trust_report_html(
     """)
 
     # 1. Product Header
-    html_content.append(f"""
+    w(f"""
         <div class="text-center">
             <h1 class="text-3xl font-bold mb-2">{html.escape(product_name)}</h1>
             <p class="text-lg text-gray-600 mb-6">Brand: {html.escape(brand_name)} ({(html.escape(brand_owner))})</p>
@@ -148,7 +151,7 @@ def generate_trust_report_html(
         color_class = NOVA_COLOR_CLASSES.get(i + 1, 'bg-red-500')
         nova_circles_html.append(f'<div class="w-6 h-6 rounded-full {color_class} {"mr-1.5" if i < nova_score - 1 else ""}"></div>')
 
-    html_content.append(f"""
+    w(f"""
         <div class="bg-purple-50 p-6 rounded-md border border-purple-200 mb-6 text-center">
             <h2 class="text-xl font-semibold text-purple-800 mb-3">NOVA Score</h2>
             <div class="flex justify-center items-center mb-3">
@@ -160,7 +163,7 @@ def generate_trust_report_html(
     """)
 
     # 3. Ingredient Breakdown Summary
-    html_content.append(f"""
+    w(f"""
         <div class="bg-white p-6 rounded-md shadow-sm mb-6">
             <h2 class="text-xl font-bold mb-4">Ingredient Breakdown Summary</h2>
             <div class="grid grid-cols-2 gap-4">
@@ -190,8 +193,15 @@ def generate_trust_report_html(
         key=lambda x: CATEGORY_SORT_PRIORITY.get(x['attributes'].get('trust_report_category'), 99)
     )
 
-    # Full Ingredient Breakdown
-    parsed_ingredients_html_list = []
+    # Full Ingredient Breakdown, with each row written directly into the section
+    w("""
+        <div class="bg-white p-6 rounded-md shadow-sm mb-6">
+            <div class="flex justify-between items-center cursor-pointer mb-4" onclick="toggleSection('parsed-ingredients-section', 'toggle-icon-1')">
+                <h2 class="text-xl font-bold">Full Ingredient Breakdown</h2>
+                <span id="toggle-icon-1" class="text-2xl font-bold">+</span>
+            </div>
+            <ul id="parsed-ingredients-section" class="space-y-3" style="display: none;">
+                """)
     for idx, p in enumerate(sorted_parsed_ingredients):
         category = p['attributes'].get('trust_report_category', 'truly_unidentified')
         display_category_name = CATEGORY_DISPLAY_NAMES.get(category, 'Unknown')
@@ -231,7 +241,7 @@ def generate_trust_report_html(
             punctuation_html = f"<div><strong>Punctuation:</strong> {html.escape(p['punctuation'])}</div>"
 
 
-        parsed_ingredients_html_list.append(f"""
+        w(f"""
                 <li class="p-3 rounded-md {bg_color} {text_color} border {border_color}">
                     <div class="flex justify-between items-center cursor-pointer" onclick="toggleItem('parsed-item-{idx}', 'parsed-icon-{idx}')">
                         <span class="font-medium text-base">
@@ -249,21 +259,14 @@ def generate_trust_report_html(
                 </li>
         """)
 
-    html_content.append(f"""
-        <div class="bg-white p-6 rounded-md shadow-sm mb-6">
-            <div class="flex justify-between items-center cursor-pointer mb-4" onclick="toggleSection('parsed-ingredients-section', 'toggle-icon-1')">
-                <h2 class="text-xl font-bold">Full Ingredient Breakdown</h2>
-                <span id="toggle-icon-1" class="text-2xl font-bold">+</span>
-            </div>
-            <ul id="parsed-ingredients-section" class="space-y-3" style="display: none;">
-                {''.join(parsed_ingredients_html_list)}
+    w("""
             </ul>
         </div>
     """)
 
     # Simple List of Raw Ingredients
     raw_ingredients_list_html = "".join([f"<li>{html.escape(item.strip())}</li>" for item in ingredients_raw.split(',') if item.strip()])
-    html_content.append(f"""
+    w(f"""
         <div class="bg-white p-6 rounded-md shadow-sm mb-6">
             <div class="flex justify-between items-center cursor-pointer mb-4" onclick="toggleSection('raw-ingredients-section', 'toggle-icon-2')">
                 <h2 class="text-xl font-bold">Simple List of Raw Ingredients</h2>
@@ -277,7 +280,7 @@ def generate_trust_report_html(
 
 
     # Data Completeness Section
-    html_content.append(f"""
+    w(f"""
         <div class="bg-blue-50 p-6 rounded-md border border-blue-200 mb-6">
             <h2 class="text-xl font-semibold text-blue-800 mb-3">Data Completeness</h2>
             <div class="w-full bg-gray-200 rounded-full h-4 mb-2">
@@ -289,10 +292,10 @@ def generate_trust_report_html(
     """)
 
     # Closing tags
-    html_content.append("""
+    w("""
     </div>
 </body>
 </html>
     """)
 
-    return "".join(html_content)
\ No newline at end of file
+    return buf.getvalue()
\ No newline at end of file
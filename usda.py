@@ -1,10 +1,21 @@
 # usda.py
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 
 API_KEY = os.getenv("USDA_API_KEY") or "your-api-key-here"
 
+# Shared session so repeat lookups reuse keep-alive TLS connections instead of
+# reconnecting per call, with a short retry on transient USDA errors.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=16, pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET",), raise_on_status=False)
+))
+
 def fetch_product_from_usda(fdc_id: str) -> dict:
     """
     Fetch product data from the USDA FoodData Central API using the given FDC ID.
@@ -14,7 +25,7 @@ def fetch_product_from_usda(fdc_id: str) -> dict:
     params = {"api_key": API_KEY}
 
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = _session.get(base_url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
 